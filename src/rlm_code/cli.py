@@ -15,6 +15,17 @@ from .summarize import run_summarize
 log = logging.getLogger(__name__)
 
 
+def _positive_int(value: str) -> int:
+    """argparse type for counts that must be at least 1."""
+    try:
+        n = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected an integer (got {value!r})") from None
+    if n < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1 (got {n})")
+    return n
+
+
 def _default_db(project_root: str) -> str:
     return str(Path(project_root).resolve() / ".rlm-code.duckdb")
 
@@ -109,7 +120,7 @@ def cmd_trace(args: argparse.Namespace) -> int:
         all_symbols = []
         for fp in store.all_file_paths():
             all_symbols.extend(store.symbols_in_file(fp))
-        all_edges = store.all_edges()
+        all_edges = store.all_resolved_edges()
         g = build_graph(all_symbols, all_edges)
 
         # Resolve names to IDs
@@ -126,7 +137,7 @@ def cmd_trace(args: argparse.Namespace) -> int:
         found = False
         for fsym in from_syms:
             for tsym in to_syms:
-                paths = shortest_paths(g, fsym.id, tsym.id)
+                paths = shortest_paths(g, fsym.id, tsym.id, max_paths=args.max_paths)
                 if paths:
                     found = True
                     print(f"\n{fsym.qualified_name} → {tsym.qualified_name}")
@@ -198,7 +209,7 @@ def cmd_patterns(args: argparse.Namespace) -> int:
         all_symbols = []
         for fp in store.all_file_paths():
             all_symbols.extend(store.symbols_in_file(fp))
-        all_edges = store.all_edges()
+        all_edges = store.all_resolved_edges()
         g = build_graph(all_symbols, all_edges)
         report = detect_patterns(g, all_symbols)
 
@@ -243,6 +254,7 @@ def cmd_summarize(args: argparse.Namespace) -> int:
         db_path=db_path,
         model=model,
         skip_fresh=not force,
+        concurrency=args.concurrency,
     )
 
     print(f"  symbols:     {stats.get('symbols', 0)}")
@@ -312,6 +324,8 @@ def main() -> None:
     p.add_argument("from_symbol", help="Starting symbol")
     p.add_argument("to_symbol", help="Target symbol")
     p.add_argument("--path", default=".", help="Project root")
+    p.add_argument("--max-paths", type=_positive_int, default=1,
+                   help="Shortest paths to show per symbol pair (default: 1)")
     p.add_argument("--db", help="Database path")
 
     # related
@@ -337,6 +351,8 @@ def main() -> None:
     p.add_argument("--db", help="Database path")
     p.add_argument("--model", help="LLM model (default: haiku)")
     p.add_argument("--force", action="store_true", help="Re-summarize even if fresh")
+    p.add_argument("--concurrency", type=int, default=8,
+                   help="Claude CLI calls in flight at once (default: 8)")
 
     # serve
     p = sub.add_parser("serve", help="Start MCP server")
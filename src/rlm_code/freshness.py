@@ -7,6 +7,7 @@ changed, deleted, and new files since the last index run.
 
 import logging
 import subprocess
+from collections.abc import Iterable
 from dataclasses import dataclass
 from pathlib import Path
 
@@ -89,13 +90,13 @@ def diff_since(project_root: str, since_sha: str) -> tuple[list[str], list[str]]
 def compute_changeset(
     project_root: str,
     last_commit: str | None,
-    indexed_paths: list[str],
+    indexed_paths: Iterable[str],
 ) -> ChangeSet:
     """
     Compute what needs re-indexing.
 
     If last_commit is None, returns a full-reindex changeset.
-    indexed_paths: list of file paths currently in the index.
+    indexed_paths: file paths currently in the index.
     """
     if last_commit is None:
         return ChangeSet(changed=[], deleted=[], added=[], is_full_reindex=True)
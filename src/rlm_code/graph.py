@@ -4,6 +4,7 @@ NetworkX graph construction, metric computation, and pattern detection.
 
 import logging
 from collections import defaultdict
+from itertools import islice
 
 import networkx as nx
 
@@ -132,13 +133,20 @@ def detect_patterns(
     )
 
 
-def shortest_paths(g: nx.DiGraph, from_id: str, to_id: str, max_paths: int = 5) -> list[list[str]]:
-    """Return up to max_paths shortest paths between two symbol IDs."""
+def shortest_paths(g: nx.DiGraph, from_id: str, to_id: str, max_paths: int = 1) -> list[list[str]]:
+    """Return up to max_paths shortest paths between two symbol IDs.
+
+    The default single path comes from a bidirectional BFS, which meets in
+    the middle instead of expanding the whole frontier out to the target.
+    Larger max_paths enumerate shortest paths lazily and stop once enough
+    are found.
+    """
     if from_id not in g or to_id not in g:
         return []
     try:
-        paths = list(nx.all_shortest_paths(g, from_id, to_id))
-        return paths[:max_paths]
+        if max_paths == 1:
+            return [nx.bidirectional_shortest_path(g, from_id, to_id)]
+        return list(islice(nx.all_shortest_paths(g, from_id, to_id), max_paths))
     except nx.NetworkXNoPath:
         return []
     except nx.NodeNotFound:
@@ -149,17 +157,18 @@ def reachable_from(g: nx.DiGraph, start_id: str, depth: int = 3) -> list[str]:
     """Return all nodes reachable from start_id within depth hops."""
     if start_id not in g:
         return []
-    nodes: set[str] = set()
-    frontier = {start_id}
+    visited: set[str] = {start_id}
+    nodes: list[str] = []
+    frontier = [start_id]
     for _ in range(depth):
-        next_frontier: set[str] = set()
+        next_frontier: list[str] = []
         for node in frontier:
             for succ in g.successors(node):
-                if succ not in nodes:
-                    nodes.add(succ)
-                    next_frontier.add(succ)
+                if succ not in visited:
+                    visited.add(succ)
+                    next_frontier.append(succ)
+        nodes.extend(next_frontier)
         frontier = next_frontier
         if not frontier:
             break
-    nodes.discard(start_id)
     return sorted(nodes)
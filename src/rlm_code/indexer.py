@@ -32,24 +32,27 @@ def _index_file(
     chash = content_hash(source)
     line_count = source.count(b"\n") + 1
 
-    # Remove stale data for this file before re-inserting
-    store.delete_edges_for_file(rel_path)
-    store.delete_symbols_for_file(rel_path)
-
-    store.upsert_file(FileRecord(
-        path=rel_path,
-        language=language,
-        content_hash=chash,
-        line_count=line_count,
-        last_indexed="",  # store sets this via now()
-    ))
-
     symbols, raw_refs = extract(rel_path, language, tree, source)
 
-    for s in symbols:
-        store.upsert_symbol(s)
+    # One transaction per file: a single commit instead of one per statement,
+    # and readers never see the file half re-indexed
+    with store.transaction():
+        # Remove stale data for this file before re-inserting
+        store.delete_edges_for_file(rel_path)
+        store.delete_symbols_for_file(rel_path)
+
+        store.upsert_file(FileRecord(
+            path=rel_path,
+            language=language,
+            content_hash=chash,
+            line_count=line_count,
+            last_indexed="",  # store sets this via now()
+        ))
 
-    store.mark_stale(rel_path)  # invalidate any existing summary
+        for s in symbols:
+            store.upsert_symbol(s)
+
+        store.mark_stale(rel_path)  # invalidate any existing summary
 
     return symbols, raw_refs
 
@@ -159,13 +162,15 @@ def _run_index_inner(config: IndexConfig, store: CodeStore, force: bool) -> dict
     for path in store.all_file_paths():
         all_stored_symbols.extend(store.symbols_in_file(path))
 
-    all_edges = store.all_edges()
+    all_edges = store.all_resolved_edges()
     g = build_graph(all_stored_symbols, all_edges)
     metrics = compute_metrics(g)
     store.bulk_upsert_metrics(metrics)
 
     log.info("Computed metrics for %d symbols", len(metrics))
 
+    store.rebuild_search_index()
+
     # Update last-indexed commit
     if current_commit:
         store.set_meta("last_indexed_commit", current_commit)
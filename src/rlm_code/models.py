@@ -12,7 +12,7 @@ class FileRecord:
     last_indexed: str           # ISO 8601 timestamp
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Symbol:
     id: str                     # "{rel_path}::{qualified_name}"
     file_path: str              # relative to project root
@@ -32,7 +32,7 @@ class RawRef:
     kind: str                   # "calls" | "imports" | "inherits"
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Edge:
     source_id: str              # Symbol.id
     target_id: str              # Symbol.id (resolved) or raw ref text (unresolved)
@@ -40,7 +40,7 @@ class Edge:
     resolved: bool              # True when target_id is a known Symbol.id
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class SymbolMetrics:
     symbol_id: str
     in_degree: int              # callers / importers
@@ -57,7 +57,7 @@ class PatternReport:
     hub_files: list[str]        # file paths with most total edges
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Summary:
     target_id: str              # Symbol.id, file path, or directory path
     target_kind: str            # "symbol" | "file" | "directory"
@@ -65,6 +65,7 @@ class Summary:
     model: str                  # LLM model used
     generated_at: str           # ISO 8601 timestamp
     is_stale: bool
+    content_hash: str | None = None  # file hash the summary was made from
 
 
 @dataclass
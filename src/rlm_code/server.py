@@ -27,16 +27,19 @@ _file_handler = logging.FileHandler(_LOG_PATH)
 _file_handler.setFormatter(logging.Formatter("%(asctime)s  %(message)s", datefmt="%Y-%m-%d %H:%M:%S"))
 _request_log.addHandler(_file_handler)
 
+import numpy as np
 from mcp.server.fastmcp import FastMCP
 
 from .graph import build_graph, detect_patterns, reachable_from, shortest_paths
 from .indexer import run_index
-from .models import IndexConfig
+from .models import IndexConfig, Summary, Symbol, SymbolMetrics
 from .store import CodeStore
 from .summarize import run_summarize
 
 log = logging.getLogger(__name__)
 
+_HOT_PATHS_LIMIT = 15   # symbols listed by hot_paths
+
 
 def _log_tool(fn):
     """Decorator that logs every MCP tool invocation with args and duration."""
@@ -194,6 +197,42 @@ def _open_store(project: str) -> CodeStore:
     return CodeStore(_default_db(root))
 
 
+# Optional lines end in "\n" or are empty, so one format call renders a block.
+_SYMBOL_TEMPLATE = (
+    "{kind}: {qname}\n"
+    "  location:  {loc}\n"
+    "  signature: {sig}\n"
+    "{summary_line}{metrics_line}{callers_line}{callees_line}"
+)
+
+
+def _fmt_summary(summary: Summary | None) -> str:
+    if summary and summary.summary_text and not summary.is_stale:
+        return f"  summary:   {summary.summary_text}\n"
+    return ""
+
+
+def _fmt_metrics(metrics: SymbolMetrics | None) -> str:
+    if not metrics:
+        return ""
+    return (
+        f"  pagerank: {metrics.pagerank:.4f}  betweenness: {metrics.betweenness:.4f}\n"
+        f"  callers: {metrics.in_degree}  callees: {metrics.out_degree}\n"
+    )
+
+
+def _fmt_neighbors(ids: list[str], known: dict[str, Symbol], label: str) -> str:
+    """Render up to 10 neighbor IDs as one line, using pre-fetched symbols."""
+    if not ids:
+        return ""
+
+    def _name(sid: str) -> str:
+        sym = known.get(sid)
+        return sym.qualified_name if sym else sid.split("::")[-1]
+
+    return f"  {label}: {', '.join(map(_name, ids[:10]))}\n"
+
+
 # ── Tools ────────────────────────────────────────────────────────────────────
 
 @mcp.tool()
@@ -237,41 +276,31 @@ def symbol_info(name: str, project: str = ".") -> str:
         if not symbols:
             return f"Symbol not found: {name}"
 
-        lines: list[str] = []
+        blocks: list[str] = []
         for sym in symbols:
-            metrics = store.get_metrics(sym.id)
             callers = store.get_callers(sym.id)
             callees = store.get_callees(sym.id)
-            lines.append(f"{sym.kind.upper()}: {sym.qualified_name}")
-            lines.append(f"  location:  {sym.file_path}:{sym.start_line}–{sym.end_line}")
-            lines.append(f"  signature: {sym.signature}")
-            summary = store.get_summary(sym.id)
-            if summary and summary.summary_text and not summary.is_stale:
-                lines.append(f"  summary:   {summary.summary_text}")
-            if metrics:
-                lines.append(f"  pagerank: {metrics.pagerank:.4f}  betweenness: {metrics.betweenness:.4f}")
-                lines.append(f"  callers: {metrics.in_degree}  callees: {metrics.out_degree}")
-            if callers:
-                caller_names = []
-                for c in callers[:10]:
-                    csym = store.get_symbol(c)
-                    caller_names.append(csym.qualified_name if csym else c.split("::")[-1])
-                lines.append(f"  called by: {', '.join(caller_names)}")
-            if callees:
-                callee_names = []
-                for c in callees[:10]:
-                    csym = store.get_symbol(c)
-                    callee_names.append(csym.qualified_name if csym else c.split("::")[-1])
-                lines.append(f"  calls: {', '.join(callee_names)}")
-            lines.append("")
-        return "\n".join(lines)
+            known = store.symbols_by_ids(callers[:10] + callees[:10])
+            blocks.append(_SYMBOL_TEMPLATE.format(
+                kind=sym.kind.upper(),
+                qname=sym.qualified_name,
+                loc=f"{sym.file_path}:{sym.start_line}–{sym.end_line}",
+                sig=sym.signature,
+                summary_line=_fmt_summary(store.get_summary(sym.id)),
+                metrics_line=_fmt_metrics(store.get_metrics(sym.id)),
+                callers_line=_fmt_neighbors(callers, known, "called by"),
+                callees_line=_fmt_neighbors(callees, known, "calls"),
+            ))
+        return "\n".join(blocks)
     finally:
         store.close()
 
 
 @mcp.tool()
 @_log_tool
-def trace_flow(from_symbol: str, to_symbol: str, project: str = ".") -> str:
+def trace_flow(
+    from_symbol: str, to_symbol: str, project: str = ".", max_paths: int = 1,
+) -> str:
     """
     Find execution paths between two symbols in the call graph.
     Useful for understanding how one function eventually leads to another.
@@ -280,13 +309,16 @@ def trace_flow(from_symbol: str, to_symbol: str, project: str = ".") -> str:
         from_symbol: Starting symbol name.
         to_symbol: Target symbol name.
         project: Path to the project root.
+        max_paths: Shortest paths to show per symbol pair (default: 1).
     """
+    if max_paths < 1:
+        return f"max_paths must be at least 1 (got {max_paths})"
     store = _open_store(project)
     try:
         all_symbols = []
         for fp in store.all_file_paths():
             all_symbols.extend(store.symbols_in_file(fp))
-        all_edges = store.all_edges()
+        all_edges = store.all_resolved_edges()
         g = build_graph(all_symbols, all_edges)
 
         from_syms = store.find_symbols_by_name(from_symbol)
@@ -301,7 +333,7 @@ def trace_flow(from_symbol: str, to_symbol: str, project: str = ".") -> str:
         found = False
         for fsym in from_syms:
             for tsym in to_syms:
-                paths = shortest_paths(g, fsym.id, tsym.id)
+                paths = shortest_paths(g, fsym.id, tsym.id, max_paths=max_paths)
                 if paths:
                     found = True
                     lines.append(f"{fsym.qualified_name} → {tsym.qualified_name}:")
@@ -340,7 +372,7 @@ def find_related(symbol: str, project: str = ".") -> str:
         all_syms = []
         for fp in store.all_file_paths():
             all_syms.extend(store.symbols_in_file(fp))
-        g = build_graph(all_syms, store.all_edges())
+        g = build_graph(all_syms, store.all_resolved_edges())
 
         lines: list[str] = []
         sym = symbols[0]
@@ -364,8 +396,11 @@ def find_related(symbol: str, project: str = ".") -> str:
                 loc = f"  ({csym.file_path}:{csym.start_line})" if csym else ""
                 lines.append(f"  → {name}{loc}")
 
+        # Direct callers/callees are already listed above; other direct
+        # successors (imports, inherits) stay, as do nodes two hops out.
         nearby = reachable_from(g, sym.id, depth=2)
-        new_nearby = [n for n in nearby if n not in {c for c in callers + callees}]
+        excluded = frozenset(callers) | frozenset(callees)
+        new_nearby = [n for n in nearby if n not in excluded]
         if new_nearby:
             lines.append(f"\nAlso reachable (2 hops, {len(new_nearby)} total):")
             for n in new_nearby[:8]:
@@ -398,21 +433,26 @@ def hot_paths(entry_point: str, project: str = ".") -> str:
         all_syms = []
         for fp in store.all_file_paths():
             all_syms.extend(store.symbols_in_file(fp))
-        g = build_graph(all_syms, store.all_edges())
+        g = build_graph(all_syms, store.all_resolved_edges())
 
         sym = syms[0]
         reachable = reachable_from(g, sym.id, depth=5)
 
-        # Rank by pagerank
-        ranked = []
-        for node_id in reachable:
-            m = store.get_metrics(node_id)
-            pr = m.pagerank if m else 0.0
-            ranked.append((node_id, pr))
-        ranked.sort(key=lambda x: x[1], reverse=True)
+        # Rank by pagerank: O(n) partition to find the 15th-best score, then
+        # sort only the candidates at or above it.  Candidates stay in
+        # symbol-id order so the stable sort breaks ties like a full sort would.
+        ids = np.asarray(reachable, dtype=object)
+        prs = np.asarray(store.pageranks_for(reachable), dtype=np.float64)
+        k = min(_HOT_PATHS_LIMIT, len(ids))
+        if len(ids) > k:
+            kth = -np.partition(-prs, k - 1)[k - 1]
+            top = np.flatnonzero(prs >= kth)
+        else:
+            top = np.arange(len(ids))
+        top = top[np.argsort(-prs[top], kind="stable")][:k]
 
         lines = [f"Hot paths from: {sym.qualified_name}\n"]
-        for node_id, pr in ranked[:15]:
+        for node_id, pr in zip(ids[top], prs[top]):
             nsym = store.get_symbol(node_id)
             if nsym:
                 m = store.get_metrics(node_id)
@@ -449,7 +489,7 @@ def module_summary(path: str, project: str = ".") -> str:
         if target.is_file():
             syms = store.symbols_in_file(rel)
             lines = [f"File: {rel}  ({len(syms)} symbols)\n"]
-            for sym in sorted(syms, key=lambda s: s.start_line):
+            for sym in syms:
                 m = store.get_metrics(sym.id)
                 in_d = m.in_degree if m else 0
                 out_d = m.out_degree if m else 0
@@ -471,15 +511,14 @@ def module_summary(path: str, project: str = ".") -> str:
                 return f"No indexed files found under: {rel}"
 
             lines = [f"Directory: {rel}  ({len(all_fps)} files)\n"]
+            kinds_by_file = store.kinds_by_file(rel)
             total_syms = 0
             for fp in sorted(all_fps):
-                syms = store.symbols_in_file(fp)
-                total_syms += len(syms)
-                kinds = {}
-                for s in syms:
-                    kinds[s.kind] = kinds.get(s.kind, 0) + 1
+                kinds = kinds_by_file.get(fp, {})
+                n_syms = sum(kinds.values())
+                total_syms += n_syms
                 kind_str = "  ".join(f"{k}×{v}" for k, v in sorted(kinds.items()))
-                lines.append(f"  {fp:<50} {len(syms):3} symbols  {kind_str}")
+                lines.append(f"  {fp:<50} {n_syms:3} symbols  {kind_str}")
             lines.append(f"\nTotal: {total_syms} symbols across {len(all_fps)} files")
             return "\n".join(lines)
 
@@ -504,7 +543,7 @@ def detect_patterns_tool(project: str = ".") -> str:
         all_syms = []
         for fp in store.all_file_paths():
             all_syms.extend(store.symbols_in_file(fp))
-        g = build_graph(all_syms, store.all_edges())
+        g = build_graph(all_syms, store.all_resolved_edges())
         report = detect_patterns(g, all_syms)
 
         lines = ["=== Architectural Patterns ===\n"]
@@ -541,7 +580,9 @@ def detect_patterns_tool(project: str = ".") -> str:
 
 @mcp.tool()
 @_log_tool
-def summarize_project(project: str = ".", model: str = "haiku", force: bool = False) -> str:
+def summarize_project(
+    project: str = ".", model: str = "haiku", force: bool = False, concurrency: int = 8,
+) -> str:
     """
     Generate LLM summaries for all indexed symbols, files, and directories.
     Uses Claude CLI (haiku model by default) to produce concise summaries.
@@ -551,6 +592,7 @@ def summarize_project(project: str = ".", model: str = "haiku", force: bool = Fa
         project: Path to the project root (must have been indexed first).
         model: LLM model to use (default: haiku).
         force: If True, re-summarize everything even if summaries exist.
+        concurrency: Maximum Claude CLI calls running at once (default: 8).
     """
     root = str(Path(project).resolve())
     db_path = _default_db(root)
@@ -559,6 +601,7 @@ def summarize_project(project: str = ".", model: str = "haiku", force: bool = Fa
         db_path=db_path,
         model=model,
         skip_fresh=not force,
+        concurrency=concurrency,
     )
     return (
         f"Summarization of {root}\n"
@@ -583,9 +626,10 @@ def project_overview(project: str = ".") -> str:
     """
     store = _open_store(project)
     try:
-        stats = store.stats()
-        last_commit = store.get_meta("last_indexed_commit")
-        top = store.top_by_pagerank(n=10)
+        bundle = store.overview_bundle(top_n=10)
+        stats = bundle["stats"]
+        last_commit = bundle["commit"]
+        top = bundle["top"]
 
         root = str(Path(project).resolve())
         lines = [
@@ -1,23 +1,34 @@
 """DuckDB schema and CodeStore — all persistence for rlm-code.
 
-DuckDB connections are NOT thread-safe: concurrent queries from different
-threads corrupt internal state ("unsuccessful or closed pending query result").
-Every public method on CodeStore holds a threading.Lock for the full duration
-of execute-through-fetch so callers (e.g. uvicorn's thread pool in the viz
-server) don't need to coordinate themselves.
+A single DuckDB connection is NOT thread-safe: concurrent queries on it from
+different threads corrupt internal state ("unsuccessful or closed pending query
+result").  CodeStore therefore hands each thread its own cursor (a child
+connection to the same database), so reads from e.g. uvicorn's thread pool in
+the viz server run in parallel without any locking.  Writes still go through a
+threading.Lock so multi-statement updates never interleave.
 """
 
 import json
 import logging
+import os
+import sys
 import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 import duckdb
 
 from .models import Edge, FileRecord, Summary, Symbol, SymbolMetrics
 
+if TYPE_CHECKING:
+    import pyarrow as pa
+
 log = logging.getLogger(__name__)
 
+_READ_CACHE_MAX = 16384  # point-lookup entries kept before the cache is reset
+
 _DDL = """
 CREATE TABLE IF NOT EXISTS meta (
     key     VARCHAR PRIMARY KEY,
@@ -65,55 +76,190 @@ CREATE TABLE IF NOT EXISTS summaries (
     summary_text    VARCHAR,
     model           VARCHAR,
     generated_at    TIMESTAMP,
-    is_stale        BOOLEAN DEFAULT true
+    is_stale        BOOLEAN DEFAULT true,
+    content_hash    VARCHAR
 );
 
+-- Databases created before summaries tracked their source file's hash
+ALTER TABLE summaries ADD COLUMN IF NOT EXISTS content_hash VARCHAR;
+
 CREATE INDEX IF NOT EXISTS idx_symbols_file ON symbols(file_path);
 CREATE INDEX IF NOT EXISTS idx_symbols_name ON symbols(name);
 CREATE INDEX IF NOT EXISTS idx_edges_source ON edges(source_id);
 CREATE INDEX IF NOT EXISTS idx_edges_target ON edges(target_id);
-CREATE INDEX IF NOT EXISTS idx_edges_kind   ON edges(kind);
+-- No index on edges.kind: three distinct values make an ART index useless
+-- for lookups while every edge insert still pays to maintain it.
+DROP INDEX IF EXISTS idx_edges_kind;
 """
 
+# The viz graph (/api/graph): symbols joined to their metrics, and resolved
+# edges, with columns already named as the frontend expects them.
+_GRAPH_NODES_SQL = """
+SELECT s.id, s.name, s.qualified_name AS "qualifiedName", s.kind,
+       s.file_path AS "filePath", s.start_line AS line,
+       COALESCE(m.pagerank, 0.0)    AS pagerank,
+       COALESCE(m.betweenness, 0.0) AS betweenness,
+       COALESCE(m.in_degree, 0)     AS "inDegree",
+       COALESCE(m.out_degree, 0)    AS "outDegree"
+FROM symbols s LEFT JOIN metrics m ON m.symbol_id = s.id
+"""
+_GRAPH_EDGES_SQL = (
+    "SELECT source_id AS source, target_id AS target, kind "
+    "FROM edges WHERE resolved"
+)
+
 
 class CodeStore:
     def __init__(self, db_path: str) -> None:
         self.db_path = db_path
-        # DuckDB connections are NOT thread-safe — concurrent queries from
-        # different threads corrupt internal state.  The lock serializes all
-        # access so callers don't need to coordinate themselves.
-        self._lock = threading.Lock()
+        # One DuckDB cursor per thread — see _cur().  The lock only
+        # serializes writers; readers never block on it.  Re-entrant so a
+        # transaction() can hold it across the writes it groups.
+        self._lock = threading.RLock()
+        self._tls = threading.local()
+        self._cursors: list[duckdb.DuckDBPyConnection] = []
+        self._cursors_lock = threading.Lock()
+        # (data_version, paths) — see all_file_paths()
+        self._file_paths_cache: tuple[tuple[int, ...], tuple[str, ...]] | None = None
+        # Point lookups (get_meta/get_file_hash/get_symbol) keyed by
+        # (method, key); valid for _read_cache_version — see _cached()
+        self._read_cache: dict[tuple[str, str], object] = {}
+        self._read_cache_version: tuple[int, ...] | None = None
         self._con = duckdb.connect(db_path)
-        self._con.execute("PRAGMA threads=4")
-        for stmt in _DDL.strip().split(";"):
-            stmt = stmt.strip()
-            if stmt:
-                self._con.execute(stmt)
+        # Viz/analytics queries scan whole tables; let them use every core
+        self._con.execute(f"PRAGMA threads={os.cpu_count() or 4}")
+        self._con.execute(_DDL)  # DuckDB runs multi-statement strings in one call
+        # Full-text search is optional: the fts extension may not be installed
+        # (it's fetched on first rebuild_search_index()), and search_symbols()
+        # falls back to ILIKE without it.
+        try:
+            self._con.execute("LOAD fts")
+            self._fts = True
+        except duckdb.Error:
+            self._fts = False
         log.debug("CodeStore opened: %s", db_path)
 
     def close(self) -> None:
+        with self._cursors_lock:
+            for cur in self._cursors:
+                cur.close()
+            self._cursors.clear()
         self._con.close()
 
+    def _cur(self) -> duckdb.DuckDBPyConnection:
+        """Return the calling thread's cursor, creating it on first use."""
+        cur = getattr(self._tls, "cur", None)
+        if cur is None:
+            with self._cursors_lock:
+                cur = self._con.cursor()
+                self._cursors.append(cur)
+            self._tls.cur = cur
+        return cur
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        """Group this thread's writes into one DuckDB transaction.
+
+        Holds the writer lock throughout, so other threads' writes wait
+        rather than conflict.  Nested use joins the outer transaction.  On
+        error everything is rolled back and the exception re-raised.
+        """
+        if getattr(self._tls, "in_txn", False):
+            yield
+            return
+        with self._lock:
+            cur = self._cur()
+            cur.execute("BEGIN TRANSACTION")
+            self._tls.in_txn = True
+            try:
+                yield
+            except BaseException:
+                cur.execute("ROLLBACK")
+                raise
+            else:
+                # Outside the except: a failed COMMIT ends the transaction
+                # itself, and a ROLLBACK on top would mask its error
+                cur.execute("COMMIT")
+            finally:
+                self._tls.in_txn = False
+                # Values read or written inside the transaction must not
+                # outlive it (rollback) or lag behind it (commit)
+                self._invalidate_caches()
+
+    def data_version(self) -> tuple[int, int, int, int]:
+        """Cheap change token: (mtime, mtime, size, size) of the database
+        file and its WAL, in that order.
+
+        DuckDB appends commits to the ``.wal`` file and only rewrites the main
+        file on checkpoint, so both are needed to notice every write.  The
+        sizes catch writes that mtimes miss on filesystems with coarse
+        timestamps (1-2 s on HFS+, FAT and some network mounts): every commit
+        grows the WAL.  All zeros for in-memory databases.
+        """
+        mtimes, sizes = [], []
+        for path in (self.db_path, self.db_path + ".wal"):
+            try:
+                st = os.stat(path)
+            except OSError:
+                mtimes.append(0)
+                sizes.append(0)
+            else:
+                mtimes.append(st.st_mtime_ns)
+                sizes.append(st.st_size)
+        return mtimes[0], mtimes[1], sizes[0], sizes[1]
+
+    def _cached(self, method: str, key, load):
+        """Memoize a point lookup until the database changes.
+
+        Entries are dropped wholesale when data_version() moves (another
+        store or process wrote) or this store writes (_invalidate_caches()).
+        A load racing with an invalidation lands in the discarded dict, so a
+        stale value is never published.
+        """
+        if getattr(self._tls, "in_txn", False):
+            return load(key)  # uncommitted reads aren't shared across threads
+        version = self.data_version()
+        if version != self._read_cache_version:
+            self._read_cache = {}
+            self._read_cache_version = version
+        cache = self._read_cache
+        try:
+            return cache[(method, key)]
+        except KeyError:
+            pass
+        value = load(key)
+        if len(cache) >= _READ_CACHE_MAX:
+            cache.clear()
+        cache[(method, key)] = value
+        return value
+
+    def _invalidate_caches(self) -> None:
+        self._file_paths_cache = None
+        self._read_cache = {}
+
     # ── meta ────────────────────────────────────────────────────────────────
 
     def get_meta(self, key: str) -> str | None:
-        with self._lock:
-            row = self._con.execute(
-                "SELECT value FROM meta WHERE key = ?", [key]
-            ).fetchone()
+        return self._cached("meta", key, self._load_meta)
+
+    def _load_meta(self, key: str) -> str | None:
+        row = self._cur().execute(
+            "SELECT value FROM meta WHERE key = ?", [key]
+        ).fetchone()
         return row[0] if row else None
 
     def set_meta(self, key: str, value: str) -> None:
         with self._lock:
-            self._con.execute(
+            self._cur().execute(
                 "INSERT OR REPLACE INTO meta VALUES (?, ?)", [key, value]
             )
+            self._invalidate_caches()
 
     # ── files ────────────────────────────────────────────────────────────────
 
     def upsert_file(self, f: FileRecord) -> None:
         with self._lock:
-            self._con.execute(
+            self._cur().execute(
                 """
                 INSERT INTO files (path, language, content_hash, line_count, last_indexed)
                 VALUES (?, ?, ?, ?, now())
@@ -125,44 +271,69 @@ class CodeStore:
                 """,
                 [f.path, f.language, f.content_hash, f.line_count],
             )
+            self._invalidate_caches()
+
+    def get_file(self, path: str) -> FileRecord | None:
+        row = self._cur().execute(
+            "SELECT path, language, content_hash, line_count, last_indexed "
+            "FROM files WHERE path = ?",
+            [path],
+        ).fetchone()
+        return FileRecord(*row) if row else None
 
     def get_file_hash(self, path: str) -> str | None:
-        with self._lock:
-            row = self._con.execute(
-                "SELECT content_hash FROM files WHERE path = ?", [path]
-            ).fetchone()
+        return self._cached("file_hash", path, self._load_file_hash)
+
+    def _load_file_hash(self, path: str) -> str | None:
+        row = self._cur().execute(
+            "SELECT content_hash FROM files WHERE path = ?", [path]
+        ).fetchone()
         return row[0] if row else None
 
     def delete_file(self, path: str) -> None:
         """Remove a file and all its symbols/edges from the index."""
-        with self._lock:
-            symbol_ids = [
-                r[0] for r in self._con.execute(
-                    "SELECT id FROM symbols WHERE file_path = ?", [path]
-                ).fetchall()
-            ]
-            if symbol_ids:
-                placeholders = ", ".join("?" * len(symbol_ids))
-                self._con.execute(
-                    f"DELETE FROM edges WHERE source_id IN ({placeholders})", symbol_ids
-                )
-                self._con.execute(
-                    f"DELETE FROM metrics WHERE symbol_id IN ({placeholders})", symbol_ids
-                )
-                self._con.execute(
-                    f"DELETE FROM symbols WHERE id IN ({placeholders})", symbol_ids
-                )
-            self._con.execute("DELETE FROM files WHERE path = ?", [path])
-
-    def all_file_paths(self) -> list[str]:
-        with self._lock:
-            return [r[0] for r in self._con.execute("SELECT path FROM files").fetchall()]
+        # DuckDB has no ON DELETE CASCADE (and edges may point at unresolved,
+        # non-symbol targets anyway), so the cascade is spelled out here and
+        # made atomic: a failure part-way can't leave orphaned edges/metrics.
+        with self.transaction():
+            cur = self._cur()
+            # Symbols go last: the edges/metrics subqueries read them
+            cur.execute(
+                "DELETE FROM edges WHERE source_id IN "
+                "(SELECT id FROM symbols WHERE file_path = ?)", [path]
+            )
+            cur.execute(
+                "DELETE FROM metrics WHERE symbol_id IN "
+                "(SELECT id FROM symbols WHERE file_path = ?)", [path]
+            )
+            cur.execute("DELETE FROM symbols WHERE file_path = ?", [path])
+            cur.execute("DELETE FROM files WHERE path = ?", [path])
+
+    def all_file_paths(self) -> tuple[str, ...]:
+        """All indexed file paths as a shared, immutable tuple.
+
+        The result is reused until the database changes (data_version) or
+        this store writes to the files table, so tools that walk every file
+        don't each re-materialize the list.  Paths are interned because the
+        same strings reappear as symbols.file_path.
+        """
+        if getattr(self._tls, "in_txn", False):
+            rows = self._cur().execute("SELECT path FROM files").fetchall()
+            return tuple(sys.intern(r[0]) for r in rows)
+        version = self.data_version()
+        cached = self._file_paths_cache
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        rows = self._cur().execute("SELECT path FROM files").fetchall()
+        paths = tuple(sys.intern(r[0]) for r in rows)
+        self._file_paths_cache = (version, paths)
+        return paths
 
     # ── symbols ──────────────────────────────────────────────────────────────
 
     def upsert_symbol(self, s: Symbol) -> None:
         with self._lock:
-            self._con.execute(
+            self._cur().execute(
                 """
                 INSERT INTO symbols
                     (id, file_path, name, qualified_name, kind, start_line, end_line, signature)
@@ -179,45 +350,76 @@ class CodeStore:
                 [s.id, s.file_path, s.name, s.qualified_name,
                  s.kind, s.start_line, s.end_line, s.signature],
             )
+            self._invalidate_caches()
 
     def get_symbol(self, symbol_id: str) -> Symbol | None:
-        with self._lock:
-            row = self._con.execute(
-                "SELECT id, file_path, name, qualified_name, kind, "
-                "start_line, end_line, signature FROM symbols WHERE id = ?",
-                [symbol_id],
-            ).fetchone()
+        return self._cached("symbol", symbol_id, self._load_symbol)
+
+    def _load_symbol(self, symbol_id: str) -> Symbol | None:
+        row = self._cur().execute(
+            "SELECT id, file_path, name, qualified_name, kind, "
+            "start_line, end_line, signature FROM symbols WHERE id = ?",
+            [symbol_id],
+        ).fetchone()
         if row:
             return Symbol(*row)
         return None
 
     def find_symbols_by_name(self, name: str) -> list[Symbol]:
-        with self._lock:
-            rows = self._con.execute(
-                "SELECT id, file_path, name, qualified_name, kind, "
-                "start_line, end_line, signature FROM symbols WHERE name = ?",
-                [name],
-            ).fetchall()
+        rows = self._cur().execute(
+            "SELECT id, file_path, name, qualified_name, kind, "
+            "start_line, end_line, signature FROM symbols WHERE name = ?",
+            [name],
+        ).fetchall()
         return [Symbol(*r) for r in rows]
 
+    def symbols_by_ids(self, symbol_ids: list[str]) -> dict[str, Symbol]:
+        """Fetch many symbols in one query, keyed by id. Unknown ids are absent."""
+        if not symbol_ids:
+            return {}
+        rows = self._cur().execute(
+            "SELECT id, file_path, name, qualified_name, kind, "
+            "start_line, end_line, signature FROM symbols "
+            "WHERE id IN (SELECT unnest(?::VARCHAR[]))",
+            [list(symbol_ids)],
+        ).fetchall()
+        return {r[0]: Symbol(*r) for r in rows}
+
     def symbols_in_file(self, file_path: str) -> list[Symbol]:
-        with self._lock:
-            rows = self._con.execute(
-                "SELECT id, file_path, name, qualified_name, kind, "
-                "start_line, end_line, signature FROM symbols WHERE file_path = ?",
-                [file_path],
-            ).fetchall()
+        """A file's symbols in source order (ties keep insertion order)."""
+        rows = self._cur().execute(
+            "SELECT id, file_path, name, qualified_name, kind, "
+            "start_line, end_line, signature FROM symbols WHERE file_path = ? "
+            "ORDER BY start_line, rowid",
+            [file_path],
+        ).fetchall()
         return [Symbol(*r) for r in rows]
 
+    def kinds_by_file(self, prefix: str) -> dict[str, dict[str, int]]:
+        """Per-file symbol counts by kind for a file or everything under a
+        directory — one GROUP BY instead of a symbols_in_file() call per file."""
+        prefix = prefix.rstrip("/")
+        rows = self._cur().execute(
+            "SELECT file_path, kind, COUNT(*) FROM symbols "
+            "WHERE file_path = ? OR starts_with(file_path, ?) "
+            "GROUP BY file_path, kind ORDER BY file_path",
+            [prefix, prefix + "/"],
+        ).fetchall()
+        kinds: dict[str, dict[str, int]] = {}
+        for file_path, kind, count in rows:
+            kinds.setdefault(file_path, {})[kind] = count
+        return kinds
+
     def delete_symbols_for_file(self, path: str) -> None:
         with self._lock:
-            self._con.execute("DELETE FROM symbols WHERE file_path = ?", [path])
+            self._cur().execute("DELETE FROM symbols WHERE file_path = ?", [path])
+            self._invalidate_caches()
 
     # ── edges ────────────────────────────────────────────────────────────────
 
     def add_edge(self, e: Edge) -> None:
         with self._lock:
-            self._con.execute(
+            self._cur().execute(
                 """
                 INSERT INTO edges (source_id, target_id, kind, resolved)
                 VALUES (?, ?, ?, ?)
@@ -229,51 +431,74 @@ class CodeStore:
     def add_edges(self, edges: list[Edge]) -> None:
         if not edges:
             return
-        rows = [(e.source_id, e.target_id, e.kind, e.resolved) for e in edges]
+        # First occurrence of each key wins, as with row-by-row ON CONFLICT DO
+        # NOTHING.  Deduplicated up front so the batch can be a plain anti-join
+        # insert: DuckDB's ON CONFLICT path does not preserve insertion order,
+        # and callers rely on edges coming back in the order they were added.
+        seen: set[tuple[str, str, str]] = set()
+        batch = []
+        for e in edges:
+            key = (e.source_id, e.target_id, e.kind)
+            if key not in seen:
+                seen.add(key)
+                batch.append(e)
+        params = [[e.source_id for e in batch], [e.target_id for e in batch],
+                  [e.kind for e in batch], [e.resolved for e in batch]]
         with self._lock:
-            self._con.executemany(
-                "INSERT INTO edges (source_id, target_id, kind, resolved) "
-                "VALUES (?, ?, ?, ?) ON CONFLICT DO NOTHING",
-                rows,
+            self._cur().execute(
+                """
+                INSERT INTO edges (source_id, target_id, kind, resolved)
+                SELECT b.* FROM (
+                    SELECT unnest(?::VARCHAR[]) AS source_id, unnest(?::VARCHAR[]) AS target_id,
+                           unnest(?::VARCHAR[]) AS kind, unnest(?::BOOLEAN[]) AS resolved
+                ) b
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM edges e
+                    WHERE e.source_id = b.source_id AND e.target_id = b.target_id
+                      AND e.kind = b.kind
+                )
+                """,
+                params,
             )
 
     def delete_edges_for_file(self, path: str) -> None:
         with self._lock:
-            symbol_ids = [r[0] for r in self._con.execute(
-                "SELECT id FROM symbols WHERE file_path = ?", [path]
-            ).fetchall()]
-            if symbol_ids:
-                placeholders = ", ".join("?" * len(symbol_ids))
-                self._con.execute(
-                    f"DELETE FROM edges WHERE source_id IN ({placeholders})", symbol_ids
-                )
+            self._cur().execute(
+                "DELETE FROM edges WHERE source_id IN "
+                "(SELECT id FROM symbols WHERE file_path = ?)", [path]
+            )
 
     def get_callers(self, symbol_id: str) -> list[str]:
-        with self._lock:
-            return [r[0] for r in self._con.execute(
-                "SELECT source_id FROM edges WHERE target_id = ? AND kind = 'calls'",
-                [symbol_id],
-            ).fetchall()]
+        return [r[0] for r in self._cur().execute(
+            "SELECT source_id FROM edges WHERE target_id = ? AND kind = 'calls'",
+            [symbol_id],
+        ).fetchall()]
 
     def get_callees(self, symbol_id: str) -> list[str]:
-        with self._lock:
-            return [r[0] for r in self._con.execute(
-                "SELECT target_id FROM edges WHERE source_id = ? AND kind = 'calls' AND resolved = true",
-                [symbol_id],
-            ).fetchall()]
+        return [r[0] for r in self._cur().execute(
+            "SELECT target_id FROM edges WHERE source_id = ? AND kind = 'calls' AND resolved = true",
+            [symbol_id],
+        ).fetchall()]
 
     def all_edges(self) -> list[Edge]:
-        with self._lock:
-            rows = self._con.execute(
-                "SELECT source_id, target_id, kind, resolved FROM edges"
-            ).fetchall()
+        rows = self._cur().execute(
+            "SELECT source_id, target_id, kind, resolved FROM edges"
+        ).fetchall()
+        return [Edge(*r) for r in rows]
+
+    def all_resolved_edges(self) -> list[Edge]:
+        """Only the resolved edges — all that build_graph() uses.  Filtering
+        in the scan skips materializing the unresolved refs in Python."""
+        rows = self._cur().execute(
+            "SELECT source_id, target_id, kind, resolved FROM edges WHERE resolved"
+        ).fetchall()
         return [Edge(*r) for r in rows]
 
     # ── metrics ──────────────────────────────────────────────────────────────
 
     def upsert_metrics(self, m: SymbolMetrics) -> None:
         with self._lock:
-            self._con.execute(
+            self._cur().execute(
                 """
                 INSERT INTO metrics (symbol_id, in_degree, out_degree, betweenness, pagerank)
                 VALUES (?, ?, ?, ?, ?)
@@ -289,143 +514,398 @@ class CodeStore:
     def bulk_upsert_metrics(self, metrics: list[SymbolMetrics]) -> None:
         if not metrics:
             return
-        rows = [(m.symbol_id, m.in_degree, m.out_degree, m.betweenness, m.pagerank)
-                for m in metrics]
+        # Columnar batch, see add_edges(): update existing rows in place, then
+        # append the new ones in input order.
+        params = [[m.symbol_id for m in metrics], [m.in_degree for m in metrics],
+                  [m.out_degree for m in metrics], [m.betweenness for m in metrics],
+                  [m.pagerank for m in metrics]]
+        batch = """
+            SELECT unnest(?::VARCHAR[]) AS symbol_id, unnest(?::INTEGER[]) AS in_degree,
+                   unnest(?::INTEGER[]) AS out_degree, unnest(?::DOUBLE[]) AS betweenness,
+                   unnest(?::DOUBLE[]) AS pagerank
+        """
         with self._lock:
-            self._con.executemany(
-                """
+            cur = self._cur()
+            cur.execute(
+                f"""
+                UPDATE metrics SET
+                    in_degree   = b.in_degree,
+                    out_degree  = b.out_degree,
+                    betweenness = b.betweenness,
+                    pagerank    = b.pagerank
+                FROM ({batch}) b
+                WHERE metrics.symbol_id = b.symbol_id
+                """,
+                params,
+            )
+            cur.execute(
+                f"""
                 INSERT INTO metrics (symbol_id, in_degree, out_degree, betweenness, pagerank)
-                VALUES (?, ?, ?, ?, ?)
-                ON CONFLICT (symbol_id) DO UPDATE SET
-                    in_degree   = excluded.in_degree,
-                    out_degree  = excluded.out_degree,
-                    betweenness = excluded.betweenness,
-                    pagerank    = excluded.pagerank
+                SELECT b.* FROM ({batch}) b
+                WHERE NOT EXISTS (SELECT 1 FROM metrics m WHERE m.symbol_id = b.symbol_id)
                 """,
-                rows,
+                params,
             )
 
     def get_metrics(self, symbol_id: str) -> SymbolMetrics | None:
-        with self._lock:
-            row = self._con.execute(
-                "SELECT symbol_id, in_degree, out_degree, betweenness, pagerank "
-                "FROM metrics WHERE symbol_id = ?",
-                [symbol_id],
-            ).fetchone()
+        row = self._cur().execute(
+            "SELECT symbol_id, in_degree, out_degree, betweenness, pagerank "
+            "FROM metrics WHERE symbol_id = ?",
+            [symbol_id],
+        ).fetchone()
         return SymbolMetrics(*row) if row else None
 
+    def pageranks_for(self, symbol_ids: list[str]) -> list[float]:
+        """PageRank for each id in one query, aligned with the input order.
+        Ids without a metrics row get 0.0."""
+        if not symbol_ids:
+            return []
+        rows = self._cur().execute(
+            "SELECT symbol_id, pagerank FROM metrics "
+            "WHERE symbol_id IN (SELECT unnest(?::VARCHAR[]))",
+            [list(symbol_ids)],
+        ).fetchall()
+        by_id = dict(rows)
+        return [by_id.get(sid, 0.0) for sid in symbol_ids]
+
     def top_by_pagerank(self, n: int = 20) -> list[tuple[str, float]]:
-        with self._lock:
-            rows = self._con.execute(
-                "SELECT symbol_id, pagerank FROM metrics ORDER BY pagerank DESC LIMIT ?", [n]
-            ).fetchall()
+        rows = self._cur().execute(
+            "SELECT symbol_id, pagerank FROM metrics ORDER BY pagerank DESC LIMIT ?", [n]
+        ).fetchall()
         return [(r[0], r[1]) for r in rows]
 
     # ── summaries ────────────────────────────────────────────────────────────
 
     def upsert_summary(self, s: Summary) -> None:
         with self._lock:
-            self._con.execute(
+            self._cur().execute(
                 """
                 INSERT INTO summaries
-                    (target_id, target_kind, summary_text, model, generated_at, is_stale)
-                VALUES (?, ?, ?, ?, ?, ?)
+                    (target_id, target_kind, summary_text, model, generated_at,
+                     is_stale, content_hash)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
                 ON CONFLICT (target_id) DO UPDATE SET
                     target_kind  = excluded.target_kind,
                     summary_text = excluded.summary_text,
                     model        = excluded.model,
                     generated_at = excluded.generated_at,
-                    is_stale     = excluded.is_stale
+                    is_stale     = excluded.is_stale,
+                    content_hash = excluded.content_hash
                 """,
                 [s.target_id, s.target_kind, s.summary_text,
-                 s.model, s.generated_at, s.is_stale],
+                 s.model, s.generated_at, s.is_stale, s.content_hash],
             )
 
-    def get_summary(self, target_id: str) -> Summary | None:
+    def bulk_upsert_summaries(self, summaries: list[Summary]) -> None:
+        """Upsert many summaries in one columnar batch, see add_edges()."""
+        if not summaries:
+            return
+        # Later duplicates overwrite earlier ones, as row-by-row upserts would
+        latest = {s.target_id: s for s in summaries}
+        batch = list(latest.values())
+        params = [[s.target_id for s in batch], [s.target_kind for s in batch],
+                  [s.summary_text for s in batch], [s.model for s in batch],
+                  [s.generated_at for s in batch], [s.is_stale for s in batch],
+                  [s.content_hash for s in batch]]
+        rows = """
+            SELECT unnest(?::VARCHAR[]) AS target_id, unnest(?::VARCHAR[]) AS target_kind,
+                   unnest(?::VARCHAR[]) AS summary_text, unnest(?::VARCHAR[]) AS model,
+                   unnest(?::TIMESTAMP[]) AS generated_at, unnest(?::BOOLEAN[]) AS is_stale,
+                   unnest(?::VARCHAR[]) AS content_hash
+        """
         with self._lock:
-            row = self._con.execute(
-                "SELECT target_id, target_kind, summary_text, model, generated_at, is_stale "
-                "FROM summaries WHERE target_id = ?",
-                [target_id],
-            ).fetchone()
+            cur = self._cur()
+            cur.execute(
+                f"""
+                UPDATE summaries SET
+                    target_kind  = b.target_kind,
+                    summary_text = b.summary_text,
+                    model        = b.model,
+                    generated_at = b.generated_at,
+                    is_stale     = b.is_stale,
+                    content_hash = b.content_hash
+                FROM ({rows}) b
+                WHERE summaries.target_id = b.target_id
+                """,
+                params,
+            )
+            cur.execute(
+                f"""
+                INSERT INTO summaries
+                    (target_id, target_kind, summary_text, model, generated_at,
+                     is_stale, content_hash)
+                SELECT b.* FROM ({rows}) b
+                WHERE NOT EXISTS (SELECT 1 FROM summaries s WHERE s.target_id = b.target_id)
+                """,
+                params,
+            )
+
+    def get_summary(self, target_id: str) -> Summary | None:
+        row = self._cur().execute(
+            "SELECT target_id, target_kind, summary_text, model, generated_at, is_stale, "
+            "content_hash FROM summaries WHERE target_id = ?",
+            [target_id],
+        ).fetchone()
         return Summary(*row) if row else None
 
     def mark_stale(self, target_id: str) -> None:
         with self._lock:
-            self._con.execute(
+            self._cur().execute(
                 "UPDATE summaries SET is_stale = true WHERE target_id = ?", [target_id]
             )
 
+    def mark_fresh(self, target_ids: list[str]) -> None:
+        """Clear the stale flag on many summaries in one statement."""
+        if not target_ids:
+            return
+        with self._lock:
+            self._cur().execute(
+                "UPDATE summaries SET is_stale = false "
+                "WHERE target_id IN (SELECT unnest(?::VARCHAR[]))",
+                [list(target_ids)],
+            )
+
+    def file_summary_states(self) -> dict[str, tuple[str, str | None, bool | None, str | None]]:
+        """Every indexed file with its summary's state in one join:
+        path → (file hash, summary's content_hash, is_stale, summary_text).
+        The summary fields are None for files never summarized."""
+        rows = self._cur().execute(
+            "SELECT f.path, f.content_hash, s.content_hash, s.is_stale, s.summary_text "
+            "FROM files f LEFT JOIN summaries s ON s.target_id = f.path"
+        ).fetchall()
+        return {r[0]: r[1:] for r in rows}
+
     # ── bulk queries (used by viz API for efficient full-dataset loads) ────
 
     def all_symbols(self) -> list[Symbol]:
         """Return every symbol in one query — used by the viz server to build
         the full graph and tree without N+1 queries per file."""
-        with self._lock:
-            rows = self._con.execute(
-                "SELECT id, file_path, name, qualified_name, kind, "
-                "start_line, end_line, signature FROM symbols"
-            ).fetchall()
+        rows = self._cur().execute(
+            "SELECT id, file_path, name, qualified_name, kind, "
+            "start_line, end_line, signature FROM symbols"
+        ).fetchall()
         return [Symbol(*r) for r in rows]
 
     def all_metrics(self) -> list[SymbolMetrics]:
         """Return every metrics row at once — avoids per-symbol lookups
         when building the graph node list."""
-        with self._lock:
-            rows = self._con.execute(
-                "SELECT symbol_id, in_degree, out_degree, betweenness, pagerank "
-                "FROM metrics"
-            ).fetchall()
+        rows = self._cur().execute(
+            "SELECT symbol_id, in_degree, out_degree, betweenness, pagerank "
+            "FROM metrics"
+        ).fetchall()
         return [SymbolMetrics(*r) for r in rows]
 
+    def graph_arrow(self) -> tuple["pa.Table", "pa.Table"]:
+        """The viz graph as two Arrow tables, (nodes, edges) — see
+        iter_graph_arrow().  The metrics join happens in DuckDB, so callers
+        get finished rows without any per-symbol Python lookups.  Requires
+        pyarrow (part of the ``viz`` extra)."""
+        cur = self._cur()
+        return (
+            cur.execute(_GRAPH_NODES_SQL).fetch_arrow_table(),
+            cur.execute(_GRAPH_EDGES_SQL).fetch_arrow_table(),
+        )
+
+    def iter_graph_arrow(self, rows_per_batch: int = 10_000) -> Iterator["pa.RecordBatchReader"]:
+        """Yield the viz graph as two Arrow batch readers: nodes (symbols with
+        their metrics), then resolved edges.  Column names match /api/graph.
+
+        Runs on a private cursor rather than the thread's, because a
+        streaming response advances the readers from whichever worker thread
+        is free; the cursor is closed once both readers are consumed.
+        """
+        with self._cursors_lock:
+            cur = self._con.cursor()
+        try:
+            yield cur.execute(_GRAPH_NODES_SQL).fetch_record_batch(rows_per_batch)
+            yield cur.execute(_GRAPH_EDGES_SQL).fetch_record_batch(rows_per_batch)
+        finally:
+            cur.close()
+
+    def tree_rows(self) -> list[tuple[str, str, int, str | None, list[dict]]]:
+        """Every file as (path, language, line_count, summary, symbols) in
+        one query.  ``symbols`` is a list of viz tree nodes (name, type, id,
+        kind, line, summary) in source order.
+
+        Rows come in tree order: at each directory level sub-directories
+        first, then files, each alphabetically.  The sort key is the path's
+        components as (is_file, name) pairs, so e.g. ``a/b/c.py`` sorts
+        before ``a/b.py``.
+        """
+        rows = self._cur().execute(
+            """
+            SELECT f.path, f.language, f.line_count, fs.summary_text,
+                   list({
+                       'name': s.name, 'type': 'symbol', 'id': s.id,
+                       'kind': s.kind, 'line': s.start_line,
+                       'summary': ss.summary_text
+                   } ORDER BY s.start_line, s.rowid) FILTER (WHERE s.id IS NOT NULL)
+            FROM files f
+            LEFT JOIN summaries fs ON fs.target_id = f.path AND fs.target_kind = 'file'
+            LEFT JOIN symbols s    ON s.file_path = f.path
+            LEFT JOIN summaries ss ON ss.target_id = s.id AND ss.target_kind = 'symbol'
+            GROUP BY f.path, f.language, f.line_count, fs.summary_text
+            ORDER BY list_transform(
+                string_split(f.path, '/'),
+                (part, i) -> (i = len(string_split(f.path, '/')), part)
+            )
+            """
+        ).fetchall()
+        return [(r[0], r[1], r[2], r[3], r[4] or []) for r in rows]
+
     def all_summaries(self) -> list[Summary]:
         """Return all summaries (symbols, files, directories) in one query."""
-        with self._lock:
-            rows = self._con.execute(
-                "SELECT target_id, target_kind, summary_text, model, "
-                "generated_at, is_stale FROM summaries"
-            ).fetchall()
+        rows = self._cur().execute(
+            "SELECT target_id, target_kind, summary_text, model, "
+            "generated_at, is_stale, content_hash FROM summaries"
+        ).fetchall()
         return [Summary(*r) for r in rows]
 
+    def summary_texts(self, target_kind: str) -> dict[str, str]:
+        """{target_id: summary_text} for one kind of target ("symbol",
+        "file" or "directory"), filtered in the scan."""
+        return dict(self._cur().execute(
+            "SELECT target_id, summary_text FROM summaries WHERE target_kind = ?",
+            [target_kind],
+        ).fetchall())
+
     def all_files(self) -> list[FileRecord]:
         """Return every file record — used for tree building and file detail views."""
-        with self._lock:
-            rows = self._con.execute(
-                "SELECT path, language, content_hash, line_count, last_indexed FROM files"
-            ).fetchall()
+        rows = self._cur().execute(
+            "SELECT path, language, content_hash, line_count, last_indexed FROM files"
+        ).fetchall()
         return [FileRecord(*r) for r in rows]
 
     def search_symbols(self, query: str, limit: int = 20) -> list[Symbol]:
-        """Case-insensitive search on symbol name and qualified_name.
-        Used by the search endpoint for typeahead results."""
-        pattern = f"%{query}%"
-        with self._lock:
-            rows = self._con.execute(
-                "SELECT id, file_path, name, qualified_name, kind, "
-                "start_line, end_line, signature FROM symbols "
-                "WHERE name ILIKE ? OR qualified_name ILIKE ? "
+        """Search symbol name and qualified_name for the typeahead endpoint.
+
+        Uses the BM25 full-text index when it exists (see
+        rebuild_search_index()), best matches first.  FTS only matches whole
+        tokens, so a partially typed name is topped up with case-insensitive
+        substring matches — which is also the whole search when the index
+        isn't available.
+
+        Results are memoized like the point lookups.  Typeahead sends one
+        query per keystroke, so on the substring-only path a query that
+        extends an earlier, exhaustive (fewer than *limit* hits) one is
+        answered by filtering that earlier result instead of scanning again.
+        """
+        return list(self._cached("search", (query, limit), self._load_search))
+
+    def _load_search(self, key: tuple[str, int]) -> list[Symbol]:
+        query, limit = key
+        # ILIKE wildcards in the query would make the Python filter disagree,
+        # and inside a transaction the cached results may predate its writes
+        if (not self._fts and not any(c in query for c in "%_\\")
+                and not getattr(self._tls, "in_txn", False)):
+            needle = query.lower()
+            cache = self._read_cache
+            for n in range(len(query) - 1, 0, -1):
+                hit = cache.get(("search", (query[:n], limit)))
+                if hit is not None and len(hit) < limit:
+                    return [
+                        s for s in hit
+                        if needle in s.name.lower() or needle in s.qualified_name.lower()
+                    ]
+        cols = ("id, file_path, name, qualified_name, kind, "
+                "start_line, end_line, signature")
+        results: list[Symbol] = []
+        if self._fts:
+            try:
+                rows = self._cur().execute(
+                    f"SELECT {cols} FROM ("
+                    f"  SELECT *, fts_main_symbols.match_bm25(id, ?) AS score FROM symbols"
+                    ") WHERE score IS NOT NULL ORDER BY score DESC LIMIT ?",
+                    [query, limit],
+                ).fetchall()
+                results = [Symbol(*r) for r in rows]
+            except duckdb.CatalogException:
+                pass  # index not built yet for this database
+        if len(results) < limit:
+            pattern = f"%{query}%"
+            rows = self._cur().execute(
+                f"SELECT {cols} FROM symbols "
+                "WHERE (name ILIKE ? OR qualified_name ILIKE ?) "
+                "AND id NOT IN (SELECT unnest(?::VARCHAR[])) "
                 "LIMIT ?",
-                [pattern, pattern, limit],
+                [pattern, pattern, [r.id for r in results], limit - len(results)],
             ).fetchall()
-        return [Symbol(*r) for r in rows]
+            results.extend(Symbol(*r) for r in rows)
+        return results
+
+    def rebuild_search_index(self) -> None:
+        """(Re)build the full-text index behind search_symbols().
+
+        DuckDB FTS indexes are not maintained on write, so this runs once at
+        the end of an indexing pass.  Failure (e.g. the extension can't be
+        downloaded offline) is logged and leaves search on the ILIKE path.
+        """
+        cur = self._cur()
+        try:
+            # May download the extension — keep that outside the writer lock
+            cur.execute("INSTALL fts")
+            cur.execute("LOAD fts")
+            with self._lock:
+                cur.execute(
+                    "PRAGMA create_fts_index('symbols', 'id', 'name', 'qualified_name', "
+                    "stemmer = 'none', stopwords = 'none', overwrite = 1)"
+                )
+            self._fts = True
+            self._invalidate_caches()  # memoized searches predate the index
+        except duckdb.Error as e:
+            log.info("Full-text search unavailable, using substring search: %s", e)
 
     # ── stats ────────────────────────────────────────────────────────────────
 
     def stats(self) -> dict:
-        with self._lock:
-            counts = {}
-            for table in ("files", "symbols", "edges", "metrics", "summaries"):
-                row = self._con.execute(f"SELECT COUNT(*) FROM {table}").fetchone()
-                counts[table] = row[0] if row else 0
-
-            lang_rows = self._con.execute(
-                "SELECT language, COUNT(*) FROM files GROUP BY language"
-            ).fetchall()
-            counts["by_language"] = {r[0]: r[1] for r in lang_rows}
-
-            kind_rows = self._con.execute(
-                "SELECT kind, COUNT(*) FROM symbols GROUP BY kind"
+        return self._collect_stats()
+
+    def overview_bundle(self, top_n: int = 10) -> dict:
+        """Stats, last indexed commit, and top symbols by PageRank read in one
+        read-only transaction — a consistent snapshot for project_overview."""
+        cur = self._cur()
+        cur.execute("BEGIN TRANSACTION READ ONLY")
+        try:
+            stats = self._collect_stats()
+            row = cur.execute(
+                "SELECT value FROM meta WHERE key = 'last_indexed_commit'"
+            ).fetchone()
+            top = cur.execute(
+                "SELECT symbol_id, pagerank FROM metrics ORDER BY pagerank DESC LIMIT ?",
+                [top_n],
             ).fetchall()
-            counts["by_kind"] = {r[0]: r[1] for r in kind_rows}
+        except Exception:
+            cur.execute("ROLLBACK")
+            raise
+        cur.execute("COMMIT")
+        return {
+            "stats": stats,
+            "commit": row[0] if row else None,
+            "top": [(r[0], r[1]) for r in top],
+        }
+
+    def _collect_stats(self) -> dict:
+        """Run the stats query on the calling thread's cursor.
+
+        All counts and both breakdowns come back as one row; the breakdowns
+        are (name, count) lists, largest first.
+        """
+        row = self._cur().execute(
+            """
+            SELECT
+                (SELECT COUNT(*) FROM files),
+                (SELECT COUNT(*) FROM symbols),
+                (SELECT COUNT(*) FROM edges),
+                (SELECT COUNT(*) FROM metrics),
+                (SELECT COUNT(*) FROM summaries),
+                (SELECT list((language, n) ORDER BY n DESC, language)
+                 FROM (SELECT language, COUNT(*) AS n FROM files GROUP BY language)),
+                (SELECT list((kind, n) ORDER BY n DESC, kind)
+                 FROM (SELECT kind, COUNT(*) AS n FROM symbols GROUP BY kind))
+            """
+        ).fetchone()
+        counts = dict(zip(("files", "symbols", "edges", "metrics", "summaries"), row[:5]))
+        counts["by_language"] = dict(row[5] or ())
+        counts["by_kind"] = dict(row[6] or ())
 
         return counts
@@ -3,22 +3,40 @@ LLM recursive bottom-up summarization via Claude CLI.
 
 Shells out to `claude -p` (print mode) for non-interactive summary generation.
 Bottom-up order: symbols → files → directories.
+
+CLI calls are I/O-bound, so they run as asyncio subprocesses with at most
+``concurrency`` files or directories in flight.  The remaining blocking work
+per file (source read, symbol lookup) is pushed to the default thread pool so
+it never stalls the event loop; DB writes stay on the coroutine that drives
+the run.
 """
 
+import asyncio
 import json
 import logging
 import os
-import subprocess
+import shutil
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
+from itertools import groupby
 from pathlib import Path
 
 from .models import Summary, Symbol
 from .store import CodeStore
 
+try:
+    # orjson.JSONDecodeError subclasses json.JSONDecodeError, so the except
+    # clauses below cover both parsers
+    from orjson import loads as json_loads
+except ImportError:  # optional speedup, see the llm extra
+    from json import loads as json_loads
+
 log = logging.getLogger(__name__)
 
 DEFAULT_MODEL = "haiku"
+DEFAULT_CONCURRENCY = 8   # claude CLI processes in flight at once
 MAX_FILE_CHARS = 100_000  # skip files larger than this
+CLAUDE_TIMEOUT = 120      # seconds per CLI call
 
 
 class Summarizer:
@@ -27,39 +45,51 @@ class Summarizer:
         store: CodeStore,
         project_root: str,
         model: str = DEFAULT_MODEL,
+        concurrency: int = DEFAULT_CONCURRENCY,
     ):
         self.store = store
         self.project_root = Path(project_root)
         self.model = model
-        self._call_count = 0
-
-    def _call_claude(self, prompt: str) -> str | None:
+        self.concurrency = max(1, concurrency)
+        self._call_count = 0  # only touched on the event loop thread, no lock needed
+        # Resolved once: every call spawns the same binary, no PATH walk per file
+        self._claude_bin = shutil.which("claude")
+        # Clean env: unset CLAUDECODE to allow nested invocation
+        self._env = {k: v for k, v in os.environ.items() if not k.startswith("CLAUDE")}
+
+    async def _call_claude(self, prompt: str) -> str | None:
         """Call claude CLI in print mode. Returns response text or None on failure."""
+        if self._claude_bin is None:
+            log.error("claude CLI not found — install Claude Code first")
+            return None
         try:
-            # Clean env: unset CLAUDECODE to allow nested invocation
-            env = {k: v for k, v in os.environ.items() if not k.startswith("CLAUDE")}
-            result = subprocess.run(
-                [
-                    "claude", "-p",
-                    "--model", self.model,
-                    "--tools", "",
-                    "--output-format", "json",
-                    "--no-session-persistence",
-                ],
-                input=prompt,
-                capture_output=True,
-                text=True,
-                timeout=120,
-                env=env,
+            proc = await asyncio.create_subprocess_exec(
+                self._claude_bin, "-p",
+                "--model", self.model,
+                "--tools", "",
+                "--output-format", "json",
+                "--no-session-persistence",
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                env=self._env,
             )
-            if result.returncode != 0:
+            try:
+                stdout, stderr = await asyncio.wait_for(
+                    proc.communicate(prompt.encode("utf-8")), timeout=CLAUDE_TIMEOUT,
+                )
+            except TimeoutError:
+                proc.kill()
+                await proc.wait()
+                raise
+            if proc.returncode != 0:
                 log.warning(
                     "claude CLI failed (rc=%d): %s",
-                    result.returncode, result.stderr[:200],
+                    proc.returncode, stderr.decode("utf-8", errors="replace")[:200],
                 )
                 return None
 
-            envelope = json.loads(result.stdout)
+            envelope = json_loads(stdout)
             self._call_count += 1
 
             if envelope.get("is_error"):
@@ -71,7 +101,7 @@ class Summarizer:
         except FileNotFoundError:
             log.error("claude CLI not found — install Claude Code first")
             return None
-        except subprocess.TimeoutExpired:
+        except TimeoutError:
             log.warning("claude CLI timed out")
             return None
         except (json.JSONDecodeError, KeyError) as e:
@@ -79,15 +109,24 @@ class Summarizer:
             return None
 
     def _read_file(self, rel_path: str) -> str | None:
-        """Read a source file from the project."""
+        """Read a source file from the project.
+
+        Returns None for unreadable files and for files that can't fit in
+        MAX_FILE_CHARS — checked against the on-disk size first (UTF-8 is at
+        most 4 bytes per char) so oversize files are never read.
+        """
         full_path = self.project_root / rel_path
         try:
-            return full_path.read_text(encoding="utf-8", errors="replace")
+            size = full_path.stat().st_size
+            if size > MAX_FILE_CHARS * 4:
+                log.info("Skipping %s (too large: %d bytes)", rel_path, size)
+                return None
+            return full_path.read_bytes().decode("utf-8", errors="replace")
         except OSError as e:
             log.warning("Cannot read %s: %s", rel_path, e)
             return None
 
-    def summarize_file(
+    async def summarize_file(
         self, rel_path: str, symbols: list[Symbol],
     ) -> dict[str, str]:
         """
@@ -96,7 +135,7 @@ class Summarizer:
         Returns a dict mapping target_id → summary_text.
         Keys include the file path (for the file summary) and symbol IDs.
         """
-        source = self._read_file(rel_path)
+        source = await asyncio.to_thread(self._read_file, rel_path)
         if source is None:
             return {}
 
@@ -124,7 +163,7 @@ class Summarizer:
             "Use the exact qualified_name as the key."
         )
 
-        response = self._call_claude(prompt)
+        response = await self._call_claude(prompt)
         if response is None:
             return {}
 
@@ -141,7 +180,7 @@ class Summarizer:
             # Strip markdown fences if present
             if text.startswith("```"):
                 text = text.split("\n", 1)[1].rsplit("```", 1)[0].strip()
-            data = json.loads(text)
+            data = json_loads(text)
 
             # File summary
             if "file_summary" in data:
@@ -150,15 +189,16 @@ class Summarizer:
             # Symbol summaries — match by qualified name
             sym_map = {s.qualified_name: s.id for s in symbols}
             if "symbols" in data and isinstance(data["symbols"], dict):
+                fuzzy: dict[str, str] | None = None
                 for qname, summary_text in data["symbols"].items():
                     if qname in sym_map:
                         summaries[sym_map[qname]] = str(summary_text)
-                    else:
-                        # Fuzzy match: try just the method name
-                        for s in symbols:
-                            if s.name == qname or s.qualified_name.endswith("." + qname):
-                                summaries[s.id] = str(summary_text)
-                                break
+                        continue
+                    # Fuzzy match: try just the method name
+                    if fuzzy is None:
+                        fuzzy = self._fuzzy_index(symbols)
+                    if qname in fuzzy:
+                        summaries[fuzzy[qname]] = str(summary_text)
 
         except (json.JSONDecodeError, KeyError, TypeError) as e:
             log.warning("Failed to parse summaries for %s: %s", rel_path, e)
@@ -168,7 +208,23 @@ class Summarizer:
 
         return summaries
 
-    def summarize_directory(
+    @staticmethod
+    def _fuzzy_index(symbols: list[Symbol]) -> dict[str, str]:
+        """Map each symbol's name and every dotted suffix of its qualified
+        name to its id.  The first symbol in order wins a shared key, the
+        same one a linear scan for ``name == key`` or
+        ``qualified_name.endswith("." + key)`` would find."""
+        index: dict[str, str] = {}
+        for s in symbols:
+            index.setdefault(s.name, s.id)
+            qname = s.qualified_name
+            dot = qname.find(".")
+            while dot != -1:
+                index.setdefault(qname[dot + 1:], s.id)
+                dot = qname.find(".", dot + 1)
+        return index
+
+    async def summarize_directory(
         self, dir_path: str, file_summaries: dict[str, str],
     ) -> str | None:
         """Summarize a directory using its file summaries."""
@@ -187,7 +243,7 @@ class Summarizer:
             "Respond with ONLY the summary text, no extra formatting."
         )
 
-        response = self._call_claude(prompt)
+        response = await self._call_claude(prompt)
         return response.strip() if response else None
 
     def run(self, skip_fresh: bool = True) -> dict:
@@ -200,36 +256,68 @@ class Summarizer:
         Returns:
             Stats dict with counts of summarized symbols, files, directories.
         """
+        coro = self._run(skip_fresh)
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(coro)
+        # Called from code already running on an event loop (the MCP server
+        # invokes sync tools on its loop thread) — asyncio.run() can't nest
+        # there, so drive the run on a helper thread instead.
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            return pool.submit(asyncio.run, coro).result()
+
+    async def _run(self, skip_fresh: bool) -> dict:
+        # Created here, on the loop that runs the whole pass, and shared by
+        # both phases so files and directories count against one bound
+        slots = asyncio.Semaphore(self.concurrency)
         now = datetime.now(timezone.utc).isoformat()
         stats = {
             "symbols": 0, "files": 0, "directories": 0,
             "skipped": 0, "errors": 0,
         }
 
-        all_files = self.store.all_file_paths()
-        total = len(all_files)
+        # path → (file hash, summary hash, is_stale, summary text), one join
+        states = self.store.file_summary_states()
 
         # ── Phase 1: files + their symbols ────────────────────────────────────
         file_summaries: dict[str, str] = {}  # rel_path → summary text
 
-        for i, fp in enumerate(sorted(all_files), 1):
-            # Check freshness
-            if skip_fresh:
-                existing = self.store.get_summary(fp)
-                if existing and not existing.is_stale and existing.summary_text:
-                    file_summaries[fp] = existing.summary_text
-                    stats["skipped"] += 1
-                    continue
+        async def _summarize(fp: str) -> tuple[str, dict[str, str]]:
+            # The slot covers the whole file — read, prompt and CLI call — so
+            # at most `concurrency` sources and prompts are in memory at once
+            async with slots:
+                # CodeStore gives each worker thread its own cursor
+                symbols = await asyncio.to_thread(self.store.symbols_in_file, fp)
+                return fp, await self.summarize_file(fp, symbols)
+
+        pending = []
+        unchanged: list[str] = []  # stale-flagged, but the file hash still matches
+        for fp in sorted(states):
+            # Check freshness: a summary made from the current file content is
+            # still good even if reindexing flagged it stale
+            file_hash, summary_hash, is_stale, text = states[fp]
+            if skip_fresh and text and (not is_stale or summary_hash == file_hash):
+                if is_stale:
+                    unchanged.append(fp)
+                file_summaries[fp] = text
+                stats["skipped"] += 1
+                continue
+            pending.append(_summarize(fp))
+        self.store.mark_fresh(unchanged)
 
-            log.info("Summarizing [%d/%d]: %s", i, total, fp)
-            symbols = self.store.symbols_in_file(fp)
-            results = self.summarize_file(fp, symbols)
+        # Progress is logged as files finish: they all start at once and
+        # then wait for a slot, so start order means little.
+        for done, next_done in enumerate(asyncio.as_completed(pending), 1):
+            fp, results = await next_done
+            log.info("Summarized [%d/%d]: %s", done, len(pending), fp)
 
             if not results:
                 stats["errors"] += 1
                 continue
 
-            # Store each summary
+            # Store the file's summaries in one batch
+            batch = []
             for target_id, text in results.items():
                 if target_id == fp:
                     kind = "file"
@@ -239,21 +327,22 @@ class Summarizer:
                     kind = "symbol"
                     stats["symbols"] += 1
 
-                self.store.upsert_summary(Summary(
+                batch.append(Summary(
                     target_id=target_id,
                     target_kind=kind,
                     summary_text=text,
                     model=self.model,
                     generated_at=now,
                     is_stale=False,
+                    content_hash=states[fp][0],
                 ))
+            self.store.bulk_upsert_summaries(batch)
 
         # ── Phase 2: directories (bottom-up) ─────────────────────────────────
         dirs: dict[str, dict[str, str]] = {}
         for fp, summary in file_summaries.items():
-            parent = str(Path(fp).parent)
-            if parent == ".":
-                parent = ""
+            # Stored paths are POSIX; top-level files land under "" (the root)
+            parent = fp.rpartition("/")[0]
             dirs.setdefault(parent, {})[fp] = summary
 
         # Sort deepest-first for bottom-up aggregation
@@ -263,29 +352,44 @@ class Summarizer:
             reverse=True,
         )
 
-        for dir_path in sorted_dirs:
-            if not dir_path:
-                continue  # skip project root
-
-            if skip_fresh:
-                existing = self.store.get_summary(dir_path)
-                if existing and not existing.is_stale and existing.summary_text:
-                    stats["skipped"] += 1
-                    continue
-
-            log.info("Summarizing directory: %s", dir_path)
-            summary = self.summarize_directory(dir_path, dirs[dir_path])
-
-            if summary:
-                self.store.upsert_summary(Summary(
+        async def _summarize_dir(dir_path: str) -> str | None:
+            async with slots:
+                return await self.summarize_directory(dir_path, dirs[dir_path])
+
+        # Same-depth directories don't depend on each other, so each level
+        # goes out as one concurrent batch (still bounded by the slots).
+        for _depth, level in groupby(sorted_dirs, key=lambda d: d.count("/")):
+            todo = []
+            for dir_path in level:
+                if not dir_path:
+                    continue  # skip project root
+
+                if skip_fresh:
+                    existing = self.store.get_summary(dir_path)
+                    if existing and not existing.is_stale and existing.summary_text:
+                        stats["skipped"] += 1
+                        continue
+
+                log.info("Summarizing directory: %s", dir_path)
+                todo.append(dir_path)
+
+            results = await asyncio.gather(
+                *(_summarize_dir(d) for d in todo)
+            )
+            batch = [
+                Summary(
                     target_id=dir_path,
                     target_kind="directory",
                     summary_text=summary,
                     model=self.model,
                     generated_at=now,
                     is_stale=False,
-                ))
-                stats["directories"] += 1
+                )
+                for dir_path, summary in zip(todo, results)
+                if summary
+            ]
+            self.store.bulk_upsert_summaries(batch)
+            stats["directories"] += len(batch)
 
         log.info(
             "Summarization complete: %d symbols, %d files, %d dirs "
@@ -302,11 +406,12 @@ def run_summarize(
     db_path: str,
     model: str = DEFAULT_MODEL,
     skip_fresh: bool = True,
+    concurrency: int = DEFAULT_CONCURRENCY,
 ) -> dict:
     """Top-level entry point for summarization."""
     store = CodeStore(db_path)
     try:
-        summarizer = Summarizer(store, project_root, model=model)
+        summarizer = Summarizer(store, project_root, model=model, concurrency=concurrency)
         return summarizer.run(skip_fresh=skip_fresh)
     finally:
         store.close()
@@ -8,18 +8,33 @@ Data flow: Browser  ↔  FastAPI endpoints  ↔  CodeStore (DuckDB)
 Static assets live in ``src/rlm_code/web/`` next to this file.
 """
 
+import asyncio
+import functools
+import gzip
+import hashlib
 import logging
+import mimetypes
+import stat
 import threading
+import time
 import webbrowser
-from collections import defaultdict
+from collections.abc import Callable, Iterator
+from email.utils import formatdate, parsedate_to_datetime
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-from fastapi import FastAPI, Query
-from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse
-from fastapi.staticfiles import StaticFiles
+import orjson
+import pyarrow as pa
+from fastapi import FastAPI, Query, Request
+from fastapi.responses import (
+    FileResponse, JSONResponse, PlainTextResponse, Response, StreamingResponse,
+)
 
 from .store import CodeStore
 
+if TYPE_CHECKING:
+    import uvicorn
+
 log = logging.getLogger(__name__)
 
 # ---------------------------------------------------------------------------
@@ -27,22 +42,130 @@ log = logging.getLogger(__name__)
 # ---------------------------------------------------------------------------
 WEB_DIR = Path(__file__).parent / "web"
 
+ARROW_STREAM_TYPE = "application/vnd.apache.arrow.stream"
+
+
+class ORJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson — the app's default response class.
+
+    Defined here rather than imported from fastapi.responses, which
+    deprecates its own copy in newer releases.
+    """
+
+    def render(self, content: object) -> bytes:
+        return orjson.dumps(content)
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    """True if the request's If-None-Match already names *etag* (or is ``*``).
+
+    Comparison is weak, as RFC 9110 requires for If-None-Match: a ``W/``
+    prefix on either side is ignored.
+    """
+    for token in request.headers.get("if-none-match", "").split(","):
+        token = token.strip()
+        if token == "*" or token.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def _accepts_gzip(request: Request) -> bool:
+    """True if Accept-Encoding allows gzip with a non-zero q-value, either
+    by name or through ``*`` when gzip is not listed explicitly."""
+    wildcard = False
+    for item in request.headers.get("accept-encoding", "").split(","):
+        coding, _, params = item.partition(";")
+        coding = coding.strip().lower()
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if coding in ("gzip", "x-gzip"):
+            return q > 0
+        if coding == "*":
+            wildcard = q > 0
+    return wildcard
+
+
+def _not_modified_since(request: Request, mtime_ns: int) -> bool:
+    """True if *mtime_ns* is strictly older than the request's
+    If-Modified-Since.  HTTP dates have whole-second precision, so a write
+    in the very second named by the header still counts as modified.
+
+    Only consulted when the client sent no If-None-Match, which takes
+    precedence (RFC 9110 §13.2.2).
+    """
+    since = request.headers.get("if-modified-since")
+    if not since or "if-none-match" in request.headers:
+        return False
+    try:
+        return mtime_ns < parsedate_to_datetime(since).timestamp() * 1_000_000_000
+    except (TypeError, ValueError):
+        return False
+
 
+@functools.cache
 def create_app(db_path: str) -> FastAPI:
     """Build and return the FastAPI application wired to *db_path*.
 
     All endpoints close over a single ``CodeStore`` instance that is
-    opened at import time and kept alive for the lifetime of the process.
+    opened here and kept alive for the lifetime of the process.  Memoized
+    per *db_path*, so starting the viz server twice in one process (CLI and
+    MCP auto-start) shares one app, one store, and its caches.
     """
 
     store = CodeStore(db_path)
 
-    app = FastAPI(title="rlm-code viz", docs_url=None, redoc_url=None)
-
-    # ── API endpoints ─────────────────────────────────────────────────────
+    app = FastAPI(
+        title="rlm-code viz", docs_url=None, redoc_url=None,
+        default_response_class=ORJSONResponse,
+    )
+
+    # ── Cached whole-index responses ──────────────────────────────────────
+    # /api/overview, /api/tree and /api/graph are pure functions of the
+    # database contents, so their serialized bodies are reused until
+    # data_version() changes.  The ETag (or, for clients that only track
+    # dates, Last-Modified) lets the browser revalidate with a 304 instead
+    # of a re-download.
+
+    json_cache: dict[str, tuple[tuple[int, ...], bytes, str]] = {}
+    # One builder per route: requests that miss together (e.g. the page's
+    # parallel loads right after a reindex) wait for a single build instead
+    # of each rebuilding the whole payload.
+    build_locks = {name: threading.Lock() for name in ("overview", "tree", "graph")}
+
+    def _cached_json(request: Request, name: str, build: Callable[[], dict]) -> Response:
+        version = store.data_version()
+        hit = json_cache.get(name)
+        if hit is None or hit[0] != version:
+            with build_locks[name]:
+                hit = json_cache.get(name)
+                if hit is None or hit[0] != version:
+                    body = orjson.dumps(build())
+                    etag = f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+                    hit = json_cache[name] = (version, body, etag)
+        version, body, etag = hit
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        mtime_ns = max(version[:2])  # db/WAL mtimes; 0 for an in-memory database
+        # Last-Modified is the mtime rounded up to a whole second, and only
+        # sent once that second is over: a later write within it would
+        # otherwise share the date and be answered with a stale 304.
+        last_modified_s = -(-mtime_ns // 1_000_000_000)
+        if mtime_ns and last_modified_s <= time.time():
+            headers["Last-Modified"] = formatdate(last_modified_s, usegmt=True)
+        if _etag_matches(request, etag) or (mtime_ns and _not_modified_since(request, mtime_ns)):
+            return Response(status_code=304, headers=headers)
+        return Response(body, media_type="application/json", headers=headers)
 
     @app.get("/api/overview")
-    def api_overview() -> dict:
+    def api_overview(request: Request) -> Response:
+        return _cached_json(request, "overview", _build_overview)
+
+    def _build_overview() -> dict:
         """High-level stats for the header bar."""
         stats = store.stats()
         return {
@@ -54,188 +177,126 @@ def create_app(db_path: str) -> FastAPI:
         }
 
     @app.get("/api/tree")
-    def api_tree() -> dict:
+    def api_tree(request: Request) -> Response:
+        return _cached_json(request, "tree", _build_tree)
+
+    @app.get("/api/graph")
+    def api_graph(request: Request, format: str = "json") -> Response:
+        if format == "arrow" or ARROW_STREAM_TYPE in request.headers.get("accept", ""):
+            return StreamingResponse(_graph_arrow_stream(), media_type=ARROW_STREAM_TYPE)
+        return _cached_json(request, "graph", _build_graph)
+
+    def _graph_arrow_stream() -> Iterator[bytes]:
+        """/api/graph as Arrow IPC: a nodes stream followed by an edges
+        stream in one body (arrow-js ``RecordBatchReader.readAll`` reads
+        both).  Each record batch is flushed to the socket as it is written,
+        so no full copy of the graph is ever held in Python."""
+        for reader in store.iter_graph_arrow():
+            sink = _ChunkSink()
+            with pa.ipc.new_stream(sink, reader.schema) as writer:
+                for batch in reader:
+                    writer.write_batch(batch)
+                    yield sink.drain()
+            yield sink.drain()  # end-of-stream marker
+
+    def _build_tree() -> dict:
         """Nested directory → file → symbol tree for the left sidebar.
 
-        Builds an in-memory dict tree from every file and symbol in the
-        index, then converts it to the recursive JSON the frontend expects.
+        One query returns every file with its symbols and summaries
+        attached (CodeStore.tree_rows), already in tree order — at each
+        level sub-directories first, then files, alphabetically — so the
+        nested JSON is assembled in a single pass over a stack of
+        open directories.  Each node has the shape the frontend expects:
+          { name, type, children, summary?, symbolCount?, kind? }
         """
-        files = store.all_files()
-        symbols = store.all_symbols()
-        summaries = {s.target_id: s.summary_text for s in store.all_summaries()}
-
-        # Group symbols by file path for quick lookup
-        sym_by_file: dict[str, list] = defaultdict(list)
-        for s in symbols:
-            sym_by_file[s.file_path].append(s)
-
-        # Build a nested dict keyed by path parts.
-        # Each node: { "_files": {basename: FileRecord}, "_dirs": {name: subtree} }
-        root: dict = {"_dirs": {}, "_files": {}}
-
-        for f in files:
-            parts = Path(f.path).parts
-            node = root
-            # Walk/create directory nodes for all but the last part (filename)
-            for part in parts[:-1]:
-                if part not in node["_dirs"]:
-                    node["_dirs"][part] = {"_dirs": {}, "_files": {}}
-                node = node["_dirs"][part]
-            # Leaf is the file itself
-            node["_files"][parts[-1]] = f
-
-        def _build_node(name: str, subtree: dict, path_prefix: str) -> dict:
-            """Recursively convert the dict tree into the JSON shape the
-            frontend expects:
-              { name, type, children, summary?, symbolCount?, kind? }
-            """
-            children: list[dict] = []
-            full_path = f"{path_prefix}/{name}" if path_prefix else name
-            symbol_count = 0
-
-            # Sub-directories first (sorted alphabetically)
-            for dname in sorted(subtree["_dirs"]):
-                child = _build_node(dname, subtree["_dirs"][dname], full_path)
-                children.append(child)
-                symbol_count += child.get("symbolCount", 0)
-
-            # Then files (sorted alphabetically)
-            for fname in sorted(subtree["_files"]):
-                frec = subtree["_files"][fname]
-                file_path = frec.path
-                file_symbols = sym_by_file.get(file_path, [])
-                symbol_count += len(file_symbols)
-
-                # Symbol children inside the file
-                sym_children = []
-                for s in sorted(file_symbols, key=lambda x: x.start_line):
-                    sym_children.append({
-                        "name": s.name,
-                        "type": "symbol",
-                        "id": s.id,
-                        "kind": s.kind,
-                        "line": s.start_line,
-                        "summary": summaries.get(s.id),
-                    })
-
-                children.append({
-                    "name": fname,
-                    "type": "file",
-                    "path": file_path,
-                    "language": frec.language,
-                    "lineCount": frec.line_count,
-                    "symbolCount": len(file_symbols),
-                    "summary": summaries.get(file_path),
-                    "children": sym_children,
-                })
-
-            return {
-                "name": name,
-                "type": "dir",
-                "path": full_path,
-                "symbolCount": symbol_count,
-                "summary": summaries.get(full_path),
-                "children": children,
-            }
-
-        # The root node wraps everything; if there's only one top-level dir
-        # we still wrap it so the frontend tree code is consistent.
-        top_children: list[dict] = []
-        total_sym = 0
-        for dname in sorted(root["_dirs"]):
-            child = _build_node(dname, root["_dirs"][dname], "")
-            top_children.append(child)
-            total_sym += child.get("symbolCount", 0)
-        for fname in sorted(root["_files"]):
-            frec = root["_files"][fname]
-            file_syms = sym_by_file.get(frec.path, [])
-            total_sym += len(file_syms)
-            sym_ch = []
-            for s in sorted(file_syms, key=lambda x: x.start_line):
-                sym_ch.append({
-                    "name": s.name, "type": "symbol", "id": s.id,
-                    "kind": s.kind, "line": s.start_line,
-                    "summary": summaries.get(s.id),
-                })
-            top_children.append({
-                "name": fname, "type": "file", "path": frec.path,
-                "language": frec.language, "lineCount": frec.line_count,
-                "symbolCount": len(file_syms),
-                "summary": summaries.get(frec.path),
-                "children": sym_ch,
+        dir_summaries = store.summary_texts("directory")
+
+        # The root wraps everything, even a single top-level dir, so the
+        # frontend tree code is consistent.
+        root: dict = {"name": "(root)", "type": "dir", "symbolCount": 0, "children": []}
+        stack: list[tuple[str, dict]] = [("", root)]  # (dir name, node), root at [0]
+
+        def _close_dir() -> None:
+            _, node = stack.pop()
+            stack[-1][1]["symbolCount"] += node["symbolCount"]
+
+        for path, language, line_count, summary, symbols in store.tree_rows():
+            *dir_parts, fname = path.split("/")
+            # Close directories that aren't ancestors of this file …
+            depth = 0
+            while (depth < len(dir_parts) and depth + 1 < len(stack)
+                   and stack[depth + 1][0] == dir_parts[depth]):
+                depth += 1
+            while len(stack) > depth + 1:
+                _close_dir()
+            # … and open the ones that are new
+            for part in dir_parts[depth:]:
+                full_path = "/".join(dir_parts[:len(stack)])
+                node = {
+                    "name": part,
+                    "type": "dir",
+                    "path": full_path,
+                    "symbolCount": 0,
+                    "summary": dir_summaries.get(full_path),
+                    "children": [],
+                }
+                stack[-1][1]["children"].append(node)
+                stack.append((part, node))
+
+            stack[-1][1]["symbolCount"] += len(symbols)
+            stack[-1][1]["children"].append({
+                "name": fname,
+                "type": "file",
+                "path": path,
+                "language": language,
+                "lineCount": line_count,
+                "symbolCount": len(symbols),
+                "summary": summary,
+                "children": symbols,
             })
 
-        return {
-            "name": "(root)",
-            "type": "dir",
-            "symbolCount": total_sym,
-            "children": top_children,
-        }
+        while len(stack) > 1:
+            _close_dir()
+        return root
 
-    @app.get("/api/graph")
-    def api_graph() -> dict:
+    def _build_graph() -> dict:
         """Full call graph: nodes (symbols + metrics) and resolved edges.
 
         The frontend sizes nodes by PageRank and colors them by kind.
         Only resolved edges are included — unresolved refs are noise for
-        visualization purposes.
+        visualization purposes.  DuckDB does the metrics join and names the
+        columns, so each Arrow row converts straight to its JSON object.
         """
-        symbols = store.all_symbols()
-        metrics_list = store.all_metrics()
-        all_edges = store.all_edges()
-
-        # Build a metrics lookup keyed by symbol_id
-        metrics_map = {m.symbol_id: m for m in metrics_list}
-
-        nodes = []
-        for s in symbols:
-            m = metrics_map.get(s.id)
-            nodes.append({
-                "id": s.id,
-                "name": s.name,
-                "qualifiedName": s.qualified_name,
-                "kind": s.kind,
-                "filePath": s.file_path,
-                "line": s.start_line,
-                "pagerank": m.pagerank if m else 0.0,
-                "betweenness": m.betweenness if m else 0.0,
-                "inDegree": m.in_degree if m else 0,
-                "outDegree": m.out_degree if m else 0,
-            })
-
-        # Only keep resolved edges so the graph doesn't include dangling refs
-        edges = []
-        for e in all_edges:
-            if e.resolved:
-                edges.append({
-                    "source": e.source_id,
-                    "target": e.target_id,
-                    "kind": e.kind,
-                })
-
-        return {"nodes": nodes, "edges": edges}
+        nodes, edges = store.graph_arrow()
+        return {"nodes": nodes.to_pylist(), "edges": edges.to_pylist()}
 
     @app.get("/api/symbol/{symbol_id:path}")
-    def api_symbol(symbol_id: str) -> JSONResponse:
+    async def api_symbol(symbol_id: str) -> Response:
         """Full detail view for a single symbol — summary, metrics,
         callers, and callees with enough info to render clickable links."""
-        sym = store.get_symbol(symbol_id)
+        # The lookups are independent, so they run concurrently in worker
+        # threads (each thread reads through its own store cursor).
+        sym, metrics, summary, callers, callees = await asyncio.gather(
+            asyncio.to_thread(store.get_symbol, symbol_id),
+            asyncio.to_thread(store.get_metrics, symbol_id),
+            asyncio.to_thread(store.get_summary, symbol_id),
+            asyncio.to_thread(store.get_callers, symbol_id),
+            asyncio.to_thread(store.get_callees, symbol_id),
+        )
         if not sym:
-            return JSONResponse({"error": "Symbol not found"}, status_code=404)
+            return ORJSONResponse({"error": "Symbol not found"}, status_code=404)
 
-        metrics = store.get_metrics(sym.id)
-        summary = store.get_summary(sym.id)
-        callers = store.get_callers(sym.id)
-        callees = store.get_callees(sym.id)
+        # All callers/callees in one query instead of a lookup per id
+        known = await asyncio.to_thread(store.symbols_by_ids, list({*callers, *callees}))
 
         def _sym_ref(sid: str) -> dict:
             """Build a minimal reference dict for a caller/callee."""
-            s = store.get_symbol(sid)
+            s = known.get(sid)
             if s:
                 return {"id": s.id, "name": s.name, "filePath": s.file_path}
             return {"id": sid, "name": sid.split("::")[-1], "filePath": None}
 
-        return JSONResponse({
+        return ORJSONResponse({
             "id": sym.id,
             "name": sym.name,
             "qualifiedName": sym.qualified_name,
@@ -254,22 +315,16 @@ def create_app(db_path: str) -> FastAPI:
         })
 
     @app.get("/api/file/{file_path:path}")
-    def api_file(file_path: str) -> JSONResponse:
+    def api_file(file_path: str) -> Response:
         """Detail view for a file — language, line count, summary, symbol list."""
-        files = store.all_files()
-        frec = None
-        for f in files:
-            if f.path == file_path:
-                frec = f
-                break
-
+        frec = store.get_file(file_path)
         if not frec:
-            return JSONResponse({"error": "File not found"}, status_code=404)
+            return ORJSONResponse({"error": "File not found"}, status_code=404)
 
         syms = store.symbols_in_file(file_path)
         summary = store.get_summary(file_path)
 
-        return JSONResponse({
+        return ORJSONResponse({
             "path": frec.path,
             "language": frec.language,
             "lineCount": frec.line_count,
@@ -283,15 +338,16 @@ def create_app(db_path: str) -> FastAPI:
                     "endLine": s.end_line,
                     "signature": s.signature,
                 }
-                for s in sorted(syms, key=lambda x: x.start_line)
+                for s in syms
             ],
         })
 
     @app.get("/api/search")
-    def api_search(q: str = Query(default="", min_length=1)) -> list[dict]:
-        """Typeahead symbol search — returns top 20 ILIKE matches."""
+    def api_search(q: str = Query(default="", min_length=1)) -> Response:
+        """Typeahead symbol search — top 20 matches, BM25-ranked when the
+        full-text index exists (see CodeStore.search_symbols)."""
         results = store.search_symbols(q, limit=20)
-        return [
+        return ORJSONResponse([
             {
                 "id": s.id,
                 "name": s.name,
@@ -300,7 +356,7 @@ def create_app(db_path: str) -> FastAPI:
                 "filePath": s.file_path,
             }
             for s in results
-        ]
+        ])
 
     # ── Source file endpoint ─────────────────────────────────────────────
     # Serves raw source code from the project root.  The project root is
@@ -310,12 +366,15 @@ def create_app(db_path: str) -> FastAPI:
     project_root = Path(db_path).resolve().parent
 
     @app.get("/api/source/{file_path:path}")
-    def api_source(file_path: str) -> PlainTextResponse:
-        """Read a source file from the project and return its raw text.
+    def api_source(request: Request, file_path: str) -> Response:
+        """Return a source file from the project as raw text.
 
         Guards against path traversal by resolving the requested path and
         verifying it stays within the project root.  Returns 404 for
-        missing files or paths that escape the root.
+        missing files or paths that escape the root.  The file is sent
+        as-is (sendfile where available) rather than decoded in Python, and
+        an ETag from its mtime and size lets the browser revalidate with
+        a 304 while it is unchanged.
         """
         resolved = (project_root / file_path).resolve()
 
@@ -325,29 +384,136 @@ def create_app(db_path: str) -> FastAPI:
         if not resolved.is_relative_to(project_root):
             return PlainTextResponse("Not found", status_code=404)
 
-        if not resolved.is_file():
-            return PlainTextResponse("Not found", status_code=404)
-
         try:
-            text = resolved.read_text(encoding="utf-8", errors="replace")
+            st = resolved.stat()
         except OSError:
-            return PlainTextResponse("Could not read file", status_code=500)
+            return PlainTextResponse("Not found", status_code=404)
+        if not stat.S_ISREG(st.st_mode):
+            return PlainTextResponse("Not found", status_code=404)
 
-        return PlainTextResponse(text)
+        etag = f'"{st.st_mtime_ns:x}-{st.st_size:x}"'
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if _etag_matches(request, etag):
+            return Response(status_code=304, headers=headers)
+        return FileResponse(
+            resolved, media_type="text/plain; charset=utf-8",
+            stat_result=st, headers=headers,
+        )
 
     # ── Static file serving ───────────────────────────────────────────────
-    # Serve the SPA's index.html at "/" and all other static assets
-    # (css, js) from the web/ directory.
+    # The SPA's index.html and its css/js are read and gzipped once here,
+    # then served from memory.  File names are not content-hashed, so the
+    # browser revalidates (no-cache) and gets a 304 while the ETag matches.
+
+    assets = _load_static_assets(WEB_DIR)
+
+    def _static(request: Request, rel_path: str) -> Response:
+        asset = assets.get(rel_path)
+        if asset is None:
+            # Same body as FastAPI's own 404s
+            return ORJSONResponse({"detail": "Not Found"}, status_code=404)
+        media_type, raw, gz, etag = asset
+        headers = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+        if _etag_matches(request, etag):
+            return Response(status_code=304, headers=headers)
+        if _accepts_gzip(request):
+            headers["Content-Encoding"] = "gzip"
+            return Response(gz, media_type=media_type, headers=headers)
+        return Response(raw, media_type=media_type, headers=headers)
+
+    @app.api_route("/", methods=["GET", "HEAD"])
+    def index_html(request: Request) -> Response:
+        return _static(request, "index.html")
+
+    @app.api_route("/css/{path:path}", methods=["GET", "HEAD"])
+    def static_css(request: Request, path: str) -> Response:
+        return _static(request, f"css/{path}")
+
+    @app.api_route("/js/{path:path}", methods=["GET", "HEAD"])
+    def static_js(request: Request, path: str) -> Response:
+        return _static(request, f"js/{path}")
 
-    @app.get("/")
-    def index_html() -> FileResponse:
-        return FileResponse(WEB_DIR / "index.html")
+    return app
 
-    # Mount static sub-directories so /css/style.css and /js/app.js work
-    app.mount("/css", StaticFiles(directory=WEB_DIR / "css"), name="css")
-    app.mount("/js", StaticFiles(directory=WEB_DIR / "js"), name="js")
 
-    return app
+def _load_static_assets(
+    web_dir: Path,
+) -> dict[str, tuple[str, bytes, bytes, str]]:
+    """Read every file under *web_dir* into memory.
+
+    Returns {relative posix path: (media type, raw bytes, gzipped bytes, ETag)}.
+    """
+    assets = {}
+    for f in web_dir.rglob("*"):
+        if not f.is_file():
+            continue
+        raw = f.read_bytes()
+        media_type = mimetypes.guess_type(f.name)[0] or "application/octet-stream"
+        etag = f'"{hashlib.blake2b(raw, digest_size=16).hexdigest()}"'
+        assets[f.relative_to(web_dir).as_posix()] = (
+            media_type, raw, gzip.compress(raw, mtime=0), etag,
+        )
+    return assets
+
+
+class _ChunkSink:
+    """Minimal writable file for pyarrow that hands back what was written
+    since the last drain(), so IPC output can be streamed chunk by chunk."""
+
+    def __init__(self) -> None:
+        self._chunks: list[bytes] = []
+        self._pos = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        chunk = bytes(data)
+        self._chunks.append(chunk)
+        self._pos += len(chunk)
+        return len(chunk)
+
+    def tell(self) -> int:
+        return self._pos
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _make_server(app: FastAPI, port: int, open_browser: bool = False) -> "uvicorn.Server":
+    """uvicorn server for the viz app on localhost:*port*.
+
+    One worker process: the app holds the DuckDB file open, and DuckDB lets
+    only one process open a database for writing.  Concurrency comes from
+    uvicorn's threadpool and the store's per-thread cursors instead.  The
+    keep-alive window is raised from uvicorn's 5 s so the page's bursts of
+    API calls, separated by user think-time, reuse their connections.
+
+    With *open_browser*, a browser tab is opened as soon as the socket is
+    listening — not after a fixed delay that may be too short or too long.
+    """
+    import uvicorn
+
+    class _Server(uvicorn.Server):
+        async def startup(self, sockets=None) -> None:
+            await super().startup(sockets=sockets)
+            if open_browser and self.started:
+                # webbrowser.open can block while it launches the browser
+                threading.Thread(
+                    target=webbrowser.open, args=[f"http://localhost:{port}"], daemon=True,
+                ).start()
+
+    config = uvicorn.Config(
+        app, host="127.0.0.1", port=port, log_level="warning",
+        timeout_keep_alive=60,
+    )
+    return _Server(config)
 
 
 def start_viz_in_thread(db_path: str, port: int = 8420, open_browser: bool = True) -> bool:
@@ -361,14 +527,13 @@ def start_viz_in_thread(db_path: str, port: int = 8420, open_browser: bool = Tru
     Args:
         db_path:      Path to the ``.rlm-code.duckdb`` database file.
         port:         TCP port to listen on (default 8420).
-        open_browser: If True, opens a browser tab after a 1-second delay.
+        open_browser: If True, opens a browser tab once the server is listening.
 
     Returns:
         True if the server was started successfully, False if the port was
         already in use (``OSError`` / ``EADDRINUSE``).
     """
     import socket
-    import uvicorn
 
     # Pre-check: try to bind the port before creating the app and thread.
     # This avoids a race where uvicorn silently fails inside the daemon thread
@@ -381,20 +546,12 @@ def start_viz_in_thread(db_path: str, port: int = 8420, open_browser: bool = Tru
         # Port already in use — another viz instance (or something else)
         return False
 
-    app = create_app(db_path)
-    url = f"http://localhost:{port}"
-
-    def _run_uvicorn() -> None:
-        """Target for the daemon thread — blocks on uvicorn.run()."""
-        uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning")
+    server = _make_server(create_app(db_path), port, open_browser)
 
-    thread = threading.Thread(target=_run_uvicorn, daemon=True)
+    # Target for the daemon thread — blocks in server.run()
+    thread = threading.Thread(target=server.run, daemon=True)
     thread.start()
 
-    if open_browser:
-        # Open browser after a brief delay so uvicorn has time to start
-        threading.Timer(1.0, webbrowser.open, args=[url]).start()
-
     return True
 
 
@@ -408,19 +565,12 @@ def run_viz_server(db_path: str, port: int = 8420, open_browser: bool = True) ->
     Args:
         db_path:      Path to the ``.rlm-code.duckdb`` database file.
         port:         TCP port to listen on (default 8420).
-        open_browser: If True, opens a browser tab after a short delay.
+        open_browser: If True, opens a browser tab once the server is listening.
     """
-    import uvicorn
-
-    app = create_app(db_path)
-    url = f"http://localhost:{port}"
-    print(f"rlm-code viz → {url}")
-
-    if open_browser:
-        # Open browser after a brief delay so uvicorn has time to start
-        threading.Timer(1.0, webbrowser.open, args=[url]).start()
+    server = _make_server(create_app(db_path), port, open_browser)
+    print(f"rlm-code viz → http://localhost:{port}")
 
     # Block the main thread — this keeps the CLI process alive until Ctrl-C.
-    # We use uvicorn.run() directly here (instead of start_viz_in_thread)
+    # We run the server directly here (instead of start_viz_in_thread)
     # because the CLI wants blocking behavior.
-    uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning")
+    server.run()